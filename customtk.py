@@ -3,23 +3,65 @@ import customtkinter as ctk
 import json
 from tkinter import *
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
+from PIL import Image, ImageOps, ImageTk
 import os
+import re
 import unicodedata
-import shutil 
+import sys
 import math  # Agregar al inicio del archivo
+import bisect
+import collections
+import concurrent.futures
+import hashlib
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
 from datetime import datetime  # Importar datetime para registrar acciones
 from git import Repo  # Asegúrate de tener gitpython instalado
-
-def commit_y_push(repo_dir, mensaje_commit):
-    try:
-        repo = Repo(repo_dir)
-        repo.git.add('html/JS/productos.json')
+try:
+	import numpy as np  # Solo lo usan las estadísticas de ventas
+except ImportError:
+	np = None
+
+def commit_y_push(repo, mensaje_commit, tiempos=None, origin=None):
+    """Hace commit de productos.json (y de las imágenes) y lo sube a origin. Lanza la excepción si algo falla.
+
+    Anota en `tiempos` los segundos de cada etapa (stage, commit, push), incluso si falla a mitad.
+    """
+    tiempos = {} if tiempos is None else tiempos
+    # Volcar los movimientos de stock pendientes antes de publicar el catálogo
+    DataManager.instance().compactar()
+    inicio = time.perf_counter()
+    # html/img incluye las imágenes nuevas y sus miniaturas, que la página necesita
+    repo.git.add('html/JS/productos.json', 'html/img')
+    tiempos['stage'] = time.perf_counter() - inicio
+    # Si un intento anterior ya hizo el commit y solo falló el push, no repetirlo
+    if not repo.head.is_valid() or repo.index.diff(repo.head.commit):
+        inicio = time.perf_counter()
         repo.index.commit(mensaje_commit)
-        repo.remote(name='origin').push()
-        print("\u2705 Cambios subidos a GitHub correctamente.")
-    except Exception as e:
-        print(f"\u274c Error al hacer commit/push: {e}")
+        tiempos['commit'] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    (origin or repo.remote(name='origin')).push()
+    tiempos['push'] = time.perf_counter() - inicio
+    return tiempos
+
+def escribir_atomico(ruta, contenido, encoding=None):
+	"""Escribe en un temporal, lo sincroniza a disco y lo renombra sobre el destino"""
+	directorio = os.path.dirname(os.path.abspath(ruta))
+	fd, temporal = tempfile.mkstemp(dir=directorio, prefix='.' + os.path.basename(ruta), suffix='.tmp')
+	try:
+		with os.fdopen(fd, 'w', encoding=encoding) as archivo:
+			archivo.write(contenido)
+			archivo.flush()
+			os.fsync(archivo.fileno())
+		os.replace(temporal, ruta)
+	except BaseException:
+		if os.path.exists(temporal):
+			os.remove(temporal)
+		raise
 
 def eliminar_acentos(cadena):
 	return ''.join(
@@ -57,8 +99,7 @@ def mostrar_imagen_producto(frame, imagen_ruta):
 	ruta_absoluta = os.path.abspath(os.path.join('html', imagen_ruta))
 	if imagen_ruta and os.path.exists(ruta_absoluta):
 		try:
-			img = Image.open(ruta_absoluta)
-			img.thumbnail((100, 100))
+			img = CacheMiniaturas.instance().miniatura(DerivadosImagen.instance().ruta(imagen_ruta, 100), 100)
 			photo = ImageTk.PhotoImage(img)
 			label = Label(frame, image=photo)
 			label.image = photo  # Keep a reference to avoid garbage collection
@@ -227,28 +268,1473 @@ def filtrar_productos(self, *args):
     self.cached_filtrados = productos_filtrados
     self.mostrar_productos(productos_filtrados)
 
+# Motor de almacenamiento del catálogo: "json" (productos.json + diario) o "sqlite"
+MOTOR_CATALOGO = "json"
+
+class CatalogoSQLite:
+	"""Motor opcional: el catálogo vive en SQLite y productos.json es solo una exportación para la web"""
+	def __init__(self, db_path):
+		self.conn = sqlite3.connect(db_path, check_same_thread=False)
+		with self.conn:
+			self.conn.executescript("""
+				CREATE TABLE IF NOT EXISTS productos (
+					id TEXT PRIMARY KEY,
+					orden INTEGER NOT NULL,
+					codigo_barras TEXT,
+					categoria TEXT,
+					disciplina TEXT,
+					stock INTEGER NOT NULL DEFAULT 0,
+					datos TEXT NOT NULL
+				);
+				CREATE INDEX IF NOT EXISTS idx_productos_codigo ON productos(codigo_barras);
+				CREATE INDEX IF NOT EXISTS idx_productos_categoria ON productos(categoria);
+				CREATE INDEX IF NOT EXISTS idx_productos_disciplina ON productos(disciplina);
+			""")
+
+	def vacio(self):
+		return self.conn.execute("SELECT 1 FROM productos LIMIT 1").fetchone() is None
+
+	def cargar(self):
+		productos = []
+		for stock, datos in self.conn.execute("SELECT stock, datos FROM productos ORDER BY orden"):
+			producto = json.loads(datos)
+			producto['stock'] = stock  # La columna es la fuente de verdad del stock
+			productos.append(producto)
+		return productos
+
+	def guardar(self, productos):
+		"""Inserta o actualiza los productos en una sola transacción.
+
+		Los nuevos van al final (MAX(orden) + 1); los existentes conservan su orden.
+		"""
+		filas = [
+			(
+				p['id'],
+				str(p['codigo_barras']) if p.get('codigo_barras') not in (None, '') else None,
+				(p.get('categoria') or {}).get('id'),
+				p.get('disciplina'),
+				p.get('stock', 0),
+				json.dumps(p)
+			)
+			for p in productos
+		]
+		with self.conn:
+			self.conn.executemany("""
+				INSERT INTO productos (id, orden, codigo_barras, categoria, disciplina, stock, datos)
+				VALUES (?, (SELECT COALESCE(MAX(orden), -1) + 1 FROM productos), ?, ?, ?, ?, ?)
+				ON CONFLICT(id) DO UPDATE SET
+					codigo_barras = excluded.codigo_barras,
+					categoria = excluded.categoria,
+					disciplina = excluded.disciplina,
+					stock = excluded.stock,
+					datos = excluded.datos
+			""", filas)
+
+	def eliminar(self, producto_id):
+		with self.conn:
+			self.conn.execute("DELETE FROM productos WHERE id = ?", (producto_id,))
+
+	def ajustar_stock(self, cambios):
+		"""Aplica todos los deltas o ninguno: si alguno deja stock negativo se deshace la transacción"""
+		with self.conn:
+			for producto_id, delta in cambios:
+				cursor = self.conn.execute(
+					"UPDATE productos SET stock = stock + ? WHERE id = ? AND stock + ? >= 0",
+					(delta, producto_id, delta)
+				)
+				if cursor.rowcount == 0:
+					raise ValueError(f"Stock insuficiente para {producto_id}")
+
 # Crear una clase gestora de datos:
 class DataManager:
-	def __init__(self):
-		self.file_path = 'html/JS/productos.json'
+	"""Catálogo compartido por toda la aplicación: se lee una vez y se sirve desde memoria"""
+	_instance = None
+
+	def __init__(self, file_path='html/JS/productos.json', motor=None, db_path='catalogo.db'):
+		self.file_path = file_path
+		# Con el motor SQLite, productos.json se regenera como exportación en cada compactación
+		self.db = CatalogoSQLite(db_path) if (motor or MOTOR_CATALOGO) == "sqlite" else None
+		# Diario de movimientos de stock junto al catálogo (una línea JSON por movimiento)
+		self.journal_path = os.path.join(os.path.dirname(file_path), 'movimientos_stock.jsonl')
+		self.intervalo_compactacion = 60  # segundos
+		self.max_pendientes = 200  # movimientos antes de forzar la compactación
+		self.demora_guardado = 0.5  # segundos para agrupar cambios seguidos en una sola escritura
 		self.productos = []
+		self.version = 0  # Aumenta con cada cambio del catálogo; las ventanas la comparan al reabrirse
+		self._por_id = {}
+		self._por_codigo = {}  # codigo_barras (str) -> producto
+		self._codigo_de = {}  # id -> clave en _por_codigo
+		self._pendientes = 0
+		self._sucio = False
+		self._timer_guardado = None
+		self._lock = threading.RLock()
+		self._evento_compactar = threading.Event()
+		self._hilo_compactacion = None
 		self.load_data()
 
+	@classmethod
+	def instance(cls):
+		"""Devuelve el gestor único del proceso, creándolo la primera vez"""
+		if cls._instance is None:
+			cls._instance = cls()
+			cls._instance.iniciar_compactacion()
+		return cls._instance
+
 	def load_data(self):
+		if self.db is not None and not self.db.vacio():
+			self.productos = self.db.cargar()
+			self._reindexar()
+			# Si la app se cortó antes de la última compactación, la exportación que lee
+			# la página quedó atrasada respecto de la base: regenerarla ahora
+			try:
+				with open(self.file_path, 'r') as file:
+					exportado = file.read()
+			except FileNotFoundError:
+				exportado = None
+			if exportado != json.dumps(self.productos, indent=2):
+				self.save_data()
+			return
+		contenido = ""
 		try:
 			with open(self.file_path, 'r') as file:
-				self.productos = json.load(file)
-		except FileNotFoundError:
+				contenido = file.read()
+				self.productos = json.loads(contenido) if contenido.strip() else []
+		except (FileNotFoundError, json.JSONDecodeError):
 			self.productos = []
+		self._reindexar()
+		# Reaplicar los movimientos que no llegaron a volcarse al catálogo
+		if self._reproducir_diario(contenido):
+			self.save_data()
+		if self.db is not None:
+			# Primera vez con SQLite: importar el catálogo existente
+			self.db.guardar(self.productos)
 
 	def save_data(self):
-		with open(self.file_path, 'w') as file:
-			json.dump(self.productos, file, indent=2)
+		"""Escribe el catálogo completo, que ya incluye los movimientos del diario, y vacía el diario"""
+		with self._lock:
+			contenido = json.dumps(self.productos, indent=2)
+			if self._pendientes:
+				# Marca con el hash del catálogo nuevo: si el programa se corta después de
+				# escribirlo, al arrancar se sabe que lo anterior a la marca ya está incluido
+				self._escribir_diario([{"checkpoint": hashlib.sha256(contenido.encode()).hexdigest()}])
+			escribir_atomico(self.file_path, contenido)
+			open(self.journal_path, 'w').close()
+			self._pendientes = 0
+			self._sucio = False
+			if self._timer_guardado is not None:
+				self._timer_guardado.cancel()
+				self._timer_guardado = None
+
+	def _programar_guardado(self, cambiados=(), eliminado=None):
+		"""Marca el catálogo como modificado; los cambios dentro de la ventana se escriben juntos"""
+		with self._lock:
+			self.version += 1
+			self._sucio = True
+			if self.db is not None:
+				# SQLite guarda solo las filas tocadas; la exportación queda para la compactación
+				if eliminado is not None:
+					self.db.eliminar(eliminado)
+				if cambiados:
+					self.db.guardar(cambiados)
+				return
+			if self._timer_guardado is None:
+				self._timer_guardado = threading.Timer(self.demora_guardado, self._guardado_diferido)
+				self._timer_guardado.daemon = True
+				self._timer_guardado.start()
+
+	def _guardado_diferido(self):
+		try:
+			with self._lock:
+				self._timer_guardado = None
+				if self._sucio:
+					self.save_data()
+		except Exception as e:
+			print(f"Error al guardar el catálogo: {e}")
+
+	def compactar(self):
+		"""Escribe ya los cambios pendientes: diario de stock y guardados diferidos"""
+		with self._lock:
+			if self._pendientes or self._sucio:
+				self.save_data()
+
+	def iniciar_compactacion(self):
+		if self._hilo_compactacion is None:
+			self._hilo_compactacion = threading.Thread(target=self._bucle_compactacion, daemon=True)
+			self._hilo_compactacion.start()
+
+	def _bucle_compactacion(self):
+		while True:
+			self._evento_compactar.wait(self.intervalo_compactacion)
+			self._evento_compactar.clear()
+			try:
+				self.compactar()
+			except Exception as e:
+				print(f"Error al compactar el diario de stock: {e}")
+
+	def _escribir_diario(self, registros):
+		with open(self.journal_path, 'a') as file:
+			for registro in registros:
+				file.write(json.dumps(registro) + "\n")
+			file.flush()
+
+	def _reproducir_diario(self, contenido_catalogo):
+		try:
+			with open(self.journal_path, 'r') as file:
+				lineas = file.readlines()
+		except FileNotFoundError:
+			return 0
+		hash_catalogo = hashlib.sha256(contenido_catalogo.encode()).hexdigest()
+		movimientos = []
+		for linea in lineas:
+			try:
+				registro = json.loads(linea)
+			except json.JSONDecodeError:
+				continue  # Línea cortada por un cierre inesperado
+			if "checkpoint" in registro:
+				if registro["checkpoint"] == hash_catalogo:
+					movimientos = []
+				continue
+			movimientos.append(registro)
+		for registro in movimientos:
+			producto = self._por_id.get(registro.get('id'))
+			if producto is not None:
+				producto['stock'] = producto.get('stock', 0) + registro.get('delta', 0)
+		self._pendientes = len(movimientos)
+		return self._pendientes
+
+	def _reindexar(self):
+		self.version += 1
+		self._por_id = {}
+		self._por_codigo = {}
+		self._codigo_de = {}
+		for producto in self.productos:
+			self._por_id[producto['id']] = producto
+			self._indexar_codigo(producto)
+
+	@staticmethod
+	def _clave_codigo(codigo):
+		return str(codigo).strip() if codigo not in (None, '') else None
+
+	def _indexar_codigo(self, producto):
+		# Si el código se repite gana el primero, igual que la búsqueda lineal anterior
+		clave = self._clave_codigo(producto.get('codigo_barras'))
+		self._codigo_de[producto['id']] = clave
+		if clave is not None:
+			self._por_codigo.setdefault(clave, producto)
+
+	def _desindexar_codigo(self, producto_id):
+		clave = self._codigo_de.pop(producto_id, None)
+		actual = self._por_codigo.get(clave)
+		if actual is not None and actual['id'] == producto_id:
+			del self._por_codigo[clave]
+			# Otro producto con el mismo código pasa a ocupar la entrada
+			for p in self.productos:
+				if p['id'] != producto_id and self._codigo_de.get(p['id']) == clave:
+					self._por_codigo[clave] = p
+					break
+
+	def get_producto(self, producto_id):
+		return self._por_id.get(producto_id)
+
+	def buscar_por_codigo(self, codigo):
+		"""Busca un producto por código de barras sin recorrer el catálogo"""
+		return self._por_codigo.get(self._clave_codigo(codigo))
+
+	def agregar_producto(self, producto):
+		with self._lock:
+			self.productos.append(producto)
+			self._por_id[producto['id']] = producto
+			self._indexar_codigo(producto)
+			self._programar_guardado(cambiados=[producto])
+
+	def actualizar_producto(self, producto):
+		self.actualizar_productos([producto])
+
+	def actualizar_productos(self, productos):
+		"""Aplica los cambios de varios productos y guarda una sola vez"""
+		with self._lock:
+			actualizados = []
+			for producto in productos:
+				actual = self._por_id.get(producto['id'])
+				if actual is None:
+					raise KeyError(f"No existe el producto {producto['id']}")
+				# Se actualiza el mismo diccionario para que las vistas abiertas lo vean
+				if actual is not producto:
+					actual.update(producto)
+				# El código de barras pudo cambiar: reubicar la entrada del índice
+				if self._clave_codigo(actual.get('codigo_barras')) != self._codigo_de.get(actual['id']):
+					self._desindexar_codigo(actual['id'])
+					self._indexar_codigo(actual)
+				actualizados.append(actual)
+			self._programar_guardado(cambiados=actualizados)
+
+	def eliminar_producto(self, producto_id):
+		with self._lock:
+			# Modificar la lista en el lugar para no romper las referencias de los diálogos
+			self.productos[:] = [p for p in self.productos if p['id'] != producto_id]
+			self._por_id.pop(producto_id, None)
+			self._desindexar_codigo(producto_id)
+			self._programar_guardado(eliminado=producto_id)
+
+	def ajustar_stock(self, cambios, motivo="Ajuste de stock"):
+		"""Suma cada delta de [(producto_id, delta), ...]; no aplica nada si algún stock queda negativo.
+
+		Los movimientos se anotan en el diario (o en SQLite) en lugar de reescribir
+		productos.json; la compactación en segundo plano los vuelca al catálogo.
+		"""
+		with self._lock:
+			nuevos = {}
+			for producto_id, delta in cambios:
+				producto = self._por_id.get(producto_id)
+				if producto is None:
+					raise KeyError(f"No existe el producto {producto_id}")
+				stock = nuevos.get(producto_id, producto.get('stock', 0)) + delta
+				if stock < 0:
+					raise ValueError(f"El producto '{producto['titulo']}' no tiene suficiente stock.")
+				nuevos[producto_id] = stock
+			if self.db is not None:
+				# Una transacción por venta; productos.json se exporta en la compactación
+				self.db.ajustar_stock(cambios)
+				self._sucio = True
+			else:
+				fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+				self._escribir_diario([
+					{"id": producto_id, "delta": delta, "motivo": motivo, "fecha": fecha}
+					for producto_id, delta in cambios
+				])
+				self._pendientes += len(cambios)
+				if self._pendientes >= self.max_pendientes:
+					self._evento_compactar.set()
+			for producto_id, stock in nuevos.items():
+				self._por_id[producto_id]['stock'] = stock
+			self.version += 1
+
+class PublicadorGit:
+	"""Publica el catálogo en GitHub desde un hilo aparte para no congelar la interfaz.
+
+	La interfaz encola mensajes con publicar() y sigue; el hilo junta los cambios hasta
+	que pasa demora_publicacion sin novedades (o hasta max_cambios_publicacion) y los
+	sube en un solo commit. Lo que no se pudo subir queda en un archivo de pendientes
+	y se reintenta.
+	"""
+	_instance = None
+
+	def __init__(self, repo_dir='.', outbox_path='publicaciones_pendientes.json', metricas_path='metricas_git.jsonl'):
+		self.repo_dir = repo_dir
+		self.outbox_path = outbox_path
+		self.metricas_path = metricas_path
+		# Repositorio y remoto se abren una vez y se reutilizan en cada publicación
+		self._repo = None
+		self._origin = None
+		self.intervalo_reintento = 60  # segundos
+		self.demora_publicacion = 30  # segundos sin cambios antes de publicar
+		self.max_cambios_publicacion = 20  # publicar sin esperar al juntar estos cambios
+		self.cola = queue.Queue()
+		self.estados = queue.Queue()  # Mensajes para la interfaz, leídos con after()
+		self._pendientes = self._cargar_outbox()
+		self._hilo = threading.Thread(target=self._bucle, daemon=True)
+		self._hilo.start()
+
+	@classmethod
+	def instance(cls):
+		if cls._instance is None:
+			cls._instance = cls()
+		return cls._instance
+
+	def publicar(self, mensaje_commit):
+		"""Encola un cambio del catálogo y vuelve enseguida"""
+		self.cola.put(mensaje_commit)
+
+	def _cargar_outbox(self):
+		try:
+			with open(self.outbox_path, 'r') as archivo:
+				return json.load(archivo)
+		except (FileNotFoundError, json.JSONDecodeError):
+			return []
+
+	def _guardar_outbox(self):
+		escribir_atomico(self.outbox_path, json.dumps(self._pendientes, indent=2))
+
+	def _informar(self, texto):
+		print(texto)
+		self.estados.put(texto)
+
+	def _abrir_repo(self):
+		if self._repo is None:
+			self._repo = Repo(self.repo_dir)
+			self._origin = self._repo.remote(name='origin')
+		return self._repo
+
+	def _registrar_metrica(self, tiempos, total, error):
+		registro = {
+			"fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+			"cambios": len(self._pendientes),
+			"stage": tiempos.get('stage'),
+			"commit": tiempos.get('commit'),
+			"push": tiempos.get('push'),
+			"total": total,
+			"error": error
+		}
+		try:
+			with open(self.metricas_path, 'a') as archivo:
+				archivo.write(json.dumps(registro) + "\n")
+		except OSError as e:
+			print(f"Error al guardar métricas de git: {e}")
+
+	def leer_metricas(self, limite=200):
+		"""Últimas publicaciones registradas, de la más nueva a la más vieja"""
+		try:
+			with open(self.metricas_path, 'r') as archivo:
+				lineas = archivo.readlines()[-limite:]
+		except FileNotFoundError:
+			return []
+		metricas = []
+		for linea in reversed(lineas):
+			try:
+				metricas.append(json.loads(linea))
+			except json.JSONDecodeError:
+				continue
+		return metricas
+
+	def _bucle(self):
+		while True:
+			try:
+				self._agregar_pendiente(self.cola.get(timeout=self.intervalo_reintento))
+			except queue.Empty:
+				if not self._pendientes:
+					continue
+			else:
+				# Seguir juntando mientras sigan llegando cambios
+				while len(self._pendientes) < self.max_cambios_publicacion:
+					try:
+						self._agregar_pendiente(self.cola.get(timeout=self.demora_publicacion))
+					except queue.Empty:
+						break
+			self._intentar()
+
+	def _agregar_pendiente(self, mensaje):
+		self._pendientes.append(mensaje)
+		self._guardar_outbox()
+		self._informar(f"\u23f3 Cambios en espera de publicación: {len(self._pendientes)}")
+
+	def _mensaje_commit(self):
+		if len(self._pendientes) == 1:
+			return self._pendientes[0]
+		return (
+			f"Actualización del catálogo ({len(self._pendientes)} cambios)\n\n"
+			+ "\n".join(f"- {mensaje}" for mensaje in self._pendientes)
+		)
+
+	def _intentar(self):
+		self._informar("\u23f3 Publicando cambios...")
+		tiempos = {}
+		inicio = time.perf_counter()
+		try:
+			commit_y_push(self._abrir_repo(), self._mensaje_commit(), tiempos, self._origin)
+		except Exception as e:
+			self._registrar_metrica(tiempos, time.perf_counter() - inicio, str(e))
+			self._informar(f"\u274c Error al hacer commit/push (se reintentará): {e}")
+			# Reabrir el repositorio en el próximo intento por si el handle quedó inválido
+			self._repo = None
+			self._origin = None
+			return
+		self._registrar_metrica(tiempos, time.perf_counter() - inicio, None)
+		self._pendientes = []
+		self._guardar_outbox()
+		self._informar("\u2705 Cambios subidos a GitHub correctamente.")
+
+class IndiceHistorial:
+	"""Registros ordenados por fecha con búsqueda binaria, posiciones por tipo de acción
+	e índice invertido de palabras (producto, detalles, códigos) para la búsqueda de texto"""
+	def __init__(self, registros):
+		self.registros = sorted(registros, key=lambda r: r.get("fecha", ""))
+		self.fechas = [r.get("fecha", "") for r in self.registros]
+		self.por_accion = {}
+		self.terminos = {}  # palabra -> posiciones de los registros que la contienen
+		for i, registro in enumerate(self.registros):
+			self.por_accion.setdefault(registro.get("accion"), []).append(i)
+			self._indexar_texto(i, registro)
+		self.vocabulario = sorted(self.terminos)  # Para buscar palabras por prefijo
+
+	@staticmethod
+	def tokens(texto):
+		return re.findall(r"\w+", eliminar_acentos(str(texto).lower()))
+
+	def _indexar_texto(self, posicion, registro):
+		"""Agrega el registro al índice de palabras y devuelve las palabras nuevas"""
+		texto = " ".join(str(registro.get(campo, "")) for campo in ("accion", "producto", "detalles"))
+		nuevas = []
+		for token in set(self.tokens(texto)):
+			posiciones = self.terminos.get(token)
+			if posiciones is None:
+				self.terminos[token] = [posicion]
+				nuevas.append(token)
+			else:
+				posiciones.append(posicion)
+		return nuevas
+
+	def agregar(self, registro):
+		fecha = registro.get("fecha", "")
+		if self.fechas and fecha < self.fechas[-1]:
+			# Llega fuera de orden (poco común): reconstruir
+			self.__init__(self.registros + [registro])
+			return
+		self.registros.append(registro)
+		self.fechas.append(fecha)
+		posicion = len(self.registros) - 1
+		self.por_accion.setdefault(registro.get("accion"), []).append(posicion)
+		for token in self._indexar_texto(posicion, registro):
+			bisect.insort(self.vocabulario, token)
+
+	def buscar(self, texto):
+		"""Posiciones de los registros que contienen todas las palabras (la última puede estar incompleta)"""
+		tokens = self.tokens(texto)
+		if not tokens:
+			return None
+		resultado = None
+		for i, token in enumerate(tokens):
+			if i == len(tokens) - 1:
+				# Mientras se escribe, la última palabra se toma como prefijo
+				desde = bisect.bisect_left(self.vocabulario, token)
+				hasta = bisect.bisect_left(self.vocabulario, token + "\uffff")
+				posiciones = set()
+				for palabra in self.vocabulario[desde:hasta]:
+					posiciones.update(self.terminos[palabra])
+			else:
+				posiciones = set(self.terminos.get(token, ()))
+			resultado = posiciones if resultado is None else resultado & posiciones
+			if not resultado:
+				break
+		return resultado
+
+	def rango(self, desde=None, hasta=None):
+		"""Posiciones [inicio, fin) de las fechas entre los prefijos desde y hasta (inclusive)"""
+		inicio = bisect.bisect_left(self.fechas, desde) if desde else 0
+		fin = bisect.bisect_right(self.fechas, hasta + "\uffff") if hasta else len(self.fechas)
+		return inicio, max(inicio, fin)
+
+	def filtrar(self, accion=None, desde=None, hasta=None, texto=None):
+		inicio, fin = self.rango(desde, hasta)
+		coincidencias = self.buscar(texto) if texto else None
+		if coincidencias is not None:
+			# Partir de las coincidencias de texto, que suelen ser pocas
+			return [
+				self.registros[i] for i in sorted(coincidencias)
+				if inicio <= i < fin and (accion is None or self.registros[i].get("accion") == accion)
+			]
+		if accion is None:
+			return self.registros[inicio:fin]
+		posiciones = self.por_accion.get(accion, [])
+		desde_pos = bisect.bisect_left(posiciones, inicio)
+		hasta_pos = bisect.bisect_left(posiciones, fin)
+		return [self.registros[i] for i in posiciones[desde_pos:hasta_pos]]
+
+class HistorialManager:
+	"""Historial de acciones partido en un archivo por mes (JSON por líneas) más un manifiesto.
+
+	El manifiesto guarda, para cada mes, el archivo, la primera y última fecha y la
+	cantidad de registros, así el historial se abre leyendo solo los meses que hacen falta.
+	Registrar una acción solo agrega una línea al segmento: el manifiesto se actualiza en
+	memoria y se escribe unos segundos después (y al cerrar). Si la app se cerró antes,
+	al abrir se recalculan los meses cuyo archivo no tiene el tamaño anotado.
+	"""
+	_instance = None
+	separadores = None  # Separadores de json.dumps para cada línea
+
+	def __init__(self, directorio='html/JS/historial', legacy_paths=('html/JS/historial.jsonl', 'html/JS/historial.json')):
+		self.directorio = directorio
+		self.manifiesto_path = os.path.join(directorio, 'manifiesto.json')
+		self.legacy_paths = legacy_paths
+		self.manifiesto = {}
+		self._indices = {}  # mes -> IndiceHistorial de los segmentos ya leídos
+		self.version = 0  # Aumenta con cada registro nuevo
+		self.demora_manifiesto = 5  # segundos para agrupar las escrituras del manifiesto
+		self._manifiesto_sucio = False
+		self._timer_manifiesto = None
+		self._lock = threading.Lock()
+		os.makedirs(directorio, exist_ok=True)
+		self._cargar_manifiesto()
+		self.migrar()
+		self._reconciliar()
+
+	@classmethod
+	def instance(cls):
+		if cls._instance is None:
+			cls._instance = cls()
+		return cls._instance
+
+	def _cargar_manifiesto(self):
+		try:
+			with open(self.manifiesto_path, 'r') as archivo:
+				self.manifiesto = json.load(archivo)
+		except (FileNotFoundError, json.JSONDecodeError):
+			self.manifiesto = {}
+
+	def _guardar_manifiesto(self):
+		escribir_atomico(self.manifiesto_path, json.dumps(self.manifiesto, indent=2, sort_keys=True))
+		self._manifiesto_sucio = False
+
+	def guardar_manifiesto(self):
+		"""Escribe el manifiesto si tiene cambios pendientes (lo llama el timer y el cierre de la app)"""
+		with self._lock:
+			self._timer_manifiesto = None
+			if self._manifiesto_sucio:
+				self._guardar_manifiesto()
+
+	def _programar_manifiesto(self):
+		self._manifiesto_sucio = True
+		if self._timer_manifiesto is None:
+			self._timer_manifiesto = threading.Timer(self.demora_manifiesto, self.guardar_manifiesto)
+			self._timer_manifiesto.daemon = True
+			self._timer_manifiesto.start()
+
+	def _leer_segmento(self, nombre_archivo):
+		registros = []
+		with open(os.path.join(self.directorio, nombre_archivo), 'r') as archivo:
+			for linea in archivo:
+				try:
+					registros.append(json.loads(linea))
+				except json.JSONDecodeError:
+					continue  # Línea cortada por un cierre inesperado
+		return registros
+
+	def _reconciliar(self):
+		"""Recalcula las entradas de los segmentos que cambiaron sin que se guardara el manifiesto"""
+		cambios = False
+		for nombre_archivo in sorted(os.listdir(self.directorio)):
+			if not nombre_archivo.endswith('.jsonl'):
+				continue
+			mes = nombre_archivo[:-len('.jsonl')]
+			ruta = os.path.join(self.directorio, nombre_archivo)
+			entrada = self.manifiesto.get(mes)
+			if entrada is not None and entrada.get("bytes") == os.path.getsize(ruta):
+				continue
+			self.manifiesto.pop(mes, None)
+			for registro in self._leer_segmento(nombre_archivo):
+				self._actualizar_manifiesto(mes, registro)
+			if mes in self.manifiesto:
+				self.manifiesto[mes]["bytes"] = os.path.getsize(ruta)
+			cambios = True
+		if cambios:
+			self._guardar_manifiesto()
+
+	@staticmethod
+	def _mes(registro):
+		return registro.get("fecha", "")[:7] or "sin-fecha"
+
+	def _actualizar_manifiesto(self, mes, registro):
+		entrada = self.manifiesto.setdefault(mes, {
+			"archivo": f"{mes}.jsonl",
+			"desde": registro.get("fecha", ""),
+			"hasta": registro.get("fecha", ""),
+			"registros": 0
+		})
+		entrada["desde"] = min(entrada["desde"], registro.get("fecha", ""))
+		entrada["hasta"] = max(entrada["hasta"], registro.get("fecha", ""))
+		entrada["registros"] += 1
+
+	def migrar(self):
+		"""Pasa una sola vez el historial viejo (historial.jsonl o historial.json) a segmentos mensuales"""
+		if self.manifiesto:
+			return
+		for ruta in self.legacy_paths:
+			if os.path.exists(ruta):
+				break
+		else:
+			return
+		try:
+			with open(ruta, 'r') as archivo:
+				if ruta.endswith('.jsonl'):
+					historial = [json.loads(linea) for linea in archivo if linea.strip()]
+				else:
+					contenido = archivo.read().strip()
+					historial = json.loads(contenido) if contenido else []
+		except json.JSONDecodeError as e:
+			print(f"No se pudo migrar el historial: {e}")
+			return
+		por_mes = {}
+		for registro in historial:
+			mes = self._mes(registro)
+			por_mes.setdefault(mes, []).append(registro)
+			self._actualizar_manifiesto(mes, registro)
+		for mes, registros in por_mes.items():
+			ruta_segmento = os.path.join(self.directorio, self.manifiesto[mes]["archivo"])
+			escribir_atomico(ruta_segmento, "".join(json.dumps(r) + "\n" for r in registros))
+			self.manifiesto[mes]["bytes"] = os.path.getsize(ruta_segmento)
+		self._guardar_manifiesto()
+		# Renombrar el original para que no se vuelva a migrar ni se confunda con el vigente
+		os.replace(ruta, ruta + ".migrado")
+
+	def registrar(self, registro):
+		mes = self._mes(registro)
+		with self._lock:
+			self._actualizar_manifiesto(mes, registro)
+			ruta_segmento = os.path.join(self.directorio, self.manifiesto[mes]["archivo"])
+			with open(ruta_segmento, 'a') as archivo:
+				archivo.write(json.dumps(registro, separators=self.separadores) + "\n")
+			# El tamaño anotado permite detectar al abrir si el manifiesto quedó atrasado
+			self.manifiesto[mes]["bytes"] = os.path.getsize(ruta_segmento)
+			self._programar_manifiesto()
+			if mes in self._indices:
+				self._indices[mes].agregar(registro)
+			self.version += 1
+
+	def meses(self):
+		return sorted(self.manifiesto)
+
+	@staticmethod
+	def es_prefijo_fecha(texto):
+		return bool(re.match(r"^\d{4}(-\d{0,2}){0,2}( [\d:]*)?$", texto))
+
+	def meses_entre(self, desde=None, hasta=None):
+		"""Meses que pueden tener registros entre los prefijos de fecha desde y hasta"""
+		desde = (desde or "")[:7]
+		hasta = (hasta or "")[:7]
+		return [
+			mes for mes in self.meses()
+			if mes[:len(desde)] >= desde and mes[:len(hasta)] <= hasta
+		]
+
+	def _indice(self, mes):
+		if mes not in self._indices:
+			registros = []
+			try:
+				registros = self._leer_segmento(self.manifiesto[mes]["archivo"])
+			except (FileNotFoundError, KeyError):
+				pass
+			self._indices[mes] = IndiceHistorial(registros)
+		return self._indices[mes]
+
+	def cargar(self, meses=None):
+		"""Registros de los meses pedidos (todos si no se indica), en orden cronológico"""
+		historial = []
+		with self._lock:
+			for mes in sorted(self.meses() if meses is None else meses):
+				historial.extend(self._indice(mes).registros)
+		return historial
+
+	def filtrar(self, accion=None, desde=None, hasta=None, texto=None):
+		"""Registros de una acción (o todas) entre dos prefijos de fecha y con las palabras
+		buscadas, usando los índices en lugar de recorrer el historial"""
+		historial = []
+		with self._lock:
+			for mes in self.meses_entre(desde, hasta):
+				historial.extend(self._indice(mes).filtrar(accion, desde, hasta, texto))
+		return historial
+
+class VentasManager(HistorialManager):
+	"""Libro de ventas con campos tipados, en los mismos segmentos mensuales que el historial.
+
+	Cada venta es una línea compacta con id, fecha, total e items
+	(producto_id, codigo_barras, titulo, categoria, cantidad, precio_unitario, total),
+	para que los reportes no tengan que interpretar el texto de detalles.
+	"""
+	_instance = None
+	separadores = (',', ':')
+
+	def __init__(self, directorio='html/JS/ventas'):
+		super().__init__(directorio, legacy_paths=())
+
+	def registrar_venta(self, lineas):
+		"""Registra una venta a partir de [(producto, cantidad), ...] y devuelve el registro"""
+		ahora = datetime.now()
+		items = []
+		for producto, cantidad in lineas:
+			precio = float(producto['precio'])
+			items.append({
+				"producto_id": producto['id'],
+				"codigo_barras": producto.get('codigo_barras'),
+				"titulo": producto['titulo'],
+				"categoria": (producto.get('categoria') or {}).get('id', ''),
+				"cantidad": int(cantidad),
+				"precio_unitario": precio,
+				"total": precio * int(cantidad)
+			})
+		venta = {
+			"id": f"V{ahora.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}",
+			"fecha": ahora.strftime("%Y-%m-%d %H:%M:%S"),
+			"total": sum(item["total"] for item in items),
+			"items": items
+		}
+		self.registrar(venta)
+		return venta
+
+class AnalisisVentas:
+	"""Estadísticas de ventas sobre columnas de NumPy (una fila por item vendido).
+
+	Las agrupaciones se resuelven con np.unique + np.bincount, sin recorrer las
+	ventas en Python, así siguen siendo rápidas con cientos de miles de líneas.
+	"""
+	def __init__(self, ventas):
+		fechas, productos, titulos, categorias, cantidades, totales = [], [], {}, [], [], []
+		for venta in ventas:
+			for item in venta.get("items", []):
+				fechas.append(venta["fecha"])
+				productos.append(item["producto_id"])
+				titulos[item["producto_id"]] = item.get("titulo", item["producto_id"])
+				categorias.append(item.get("categoria", ""))
+				cantidades.append(item["cantidad"])
+				totales.append(item["total"])
+		self.titulos = titulos
+		self.fechas = np.array(fechas, dtype='datetime64[s]')
+		self.dias = self.fechas.astype('datetime64[D]')
+		self.horas = (self.fechas - self.dias).astype('timedelta64[h]').astype(int)
+		self.productos, self.producto_idx = np.unique(np.array(productos, dtype=str), return_inverse=True)
+		self.categorias, self.categoria_idx = np.unique(np.array(categorias, dtype=str), return_inverse=True)
+		self.cantidades = np.array(cantidades, dtype=np.int64)
+		self.totales = np.array(totales, dtype=np.float64)
+
+	def __len__(self):
+		return len(self.totales)
+
+	def _mascara(self, desde=None, hasta=None):
+		mascara = np.ones(len(self.totales), dtype=bool)
+		if desde:
+			mascara &= self.dias >= np.datetime64(desde, 'D')
+		if hasta:
+			mascara &= self.dias <= np.datetime64(hasta, 'D')
+		return mascara
+
+	def ingresos_por_dia(self, desde=None, hasta=None):
+		mascara = self._mascara(desde, hasta)
+		dias, idx = np.unique(self.dias[mascara], return_inverse=True)
+		ingresos = np.bincount(idx, weights=self.totales[mascara], minlength=len(dias))
+		return [(str(dia), float(total)) for dia, total in zip(dias, ingresos)]
+
+	def ingresos_por_hora(self, desde=None, hasta=None):
+		mascara = self._mascara(desde, hasta)
+		ingresos = np.bincount(self.horas[mascara], weights=self.totales[mascara], minlength=24)
+		return [(hora, float(total)) for hora, total in enumerate(ingresos)]
+
+	def unidades_por_producto(self, desde=None, hasta=None):
+		mascara = self._mascara(desde, hasta)
+		unidades = np.bincount(self.producto_idx[mascara], weights=self.cantidades[mascara], minlength=len(self.productos))
+		ingresos = np.bincount(self.producto_idx[mascara], weights=self.totales[mascara], minlength=len(self.productos))
+		return unidades, ingresos
+
+	def mas_vendidos(self, n=10, desde=None, hasta=None):
+		unidades, ingresos = self.unidades_por_producto(desde, hasta)
+		orden = np.argsort(-unidades, kind='stable')[:n]
+		return [
+			(self.titulos.get(str(self.productos[i]), str(self.productos[i])), int(unidades[i]), float(ingresos[i]))
+			for i in orden if unidades[i] > 0
+		]
+
+	def totales_por_categoria(self, desde=None, hasta=None):
+		mascara = self._mascara(desde, hasta)
+		unidades = np.bincount(self.categoria_idx[mascara], weights=self.cantidades[mascara], minlength=len(self.categorias))
+		ingresos = np.bincount(self.categoria_idx[mascara], weights=self.totales[mascara], minlength=len(self.categorias))
+		orden = np.argsort(-ingresos, kind='stable')
+		return [(str(self.categorias[i]) or "-", int(unidades[i]), float(ingresos[i])) for i in orden if unidades[i] > 0]
+
+class CacheMiniaturas:
+	"""Miniaturas de productos ya decodificadas, compartidas por todas las vistas.
+
+	La clave es (ruta, fecha de modificación, tamaño), así un archivo reemplazado
+	se vuelve a leer. Cuando se supera el presupuesto de memoria se descartan las
+	menos usadas.
+	"""
+	_instance = None
+
+	@classmethod
+	def instance(cls):
+		if cls._instance is None:
+			cls._instance = cls()
+		return cls._instance
+
+	def __init__(self, memoria_max=64 * 1024 * 1024):
+		self.memoria_max = memoria_max  # Bytes aproximados de píxeles en memoria
+		self.memoria = 0
+		self._entradas = collections.OrderedDict()  # clave -> [PIL.Image, CTkImage o None]
+		self._lock = threading.RLock()
+		# Decodificación en segundo plano
+		self.max_hilos = min(4, os.cpu_count() or 1)
+		self._pool = None
+		self._en_curso = {}  # clave -> funciones que esperan la imagen
+		self.listas = queue.Queue()  # (clave, ruta, tamaño, imagen PIL o None) decodificadas por el pool
+		self._sondeando = False
+
+	@staticmethod
+	def clave(ruta, tamano):
+		try:
+			return (ruta, os.path.getmtime(ruta), tamano)
+		except OSError:
+			return None
+
+	@staticmethod
+	def _peso(imagen):
+		return imagen.width * imagen.height * 4
+
+	def miniatura(self, ruta, tamano):
+		"""Imagen PIL reducida a `tamano` px; decodifica el archivo solo la primera vez"""
+		clave = self.clave(ruta, tamano)
+		if clave is None:
+			return None
+		with self._lock:
+			entrada = self._entradas.get(clave)
+			if entrada is not None:
+				self._entradas.move_to_end(clave)
+				return entrada[0]
+		with Image.open(ruta) as original:
+			original.thumbnail((tamano, tamano))
+			imagen = original.copy()
+		with self._lock:
+			if clave not in self._entradas:
+				self._entradas[clave] = [imagen, None]
+				self.memoria += self._peso(imagen)
+				self._liberar()
+		return imagen
+
+	def obtener(self, ruta, tamano):
+		"""CTkImage lista para mostrar (llamar desde el hilo de Tk)"""
+		imagen = self.miniatura(ruta, tamano)
+		if imagen is None:
+			return None
+		clave = self.clave(ruta, tamano)
+		with self._lock:
+			entrada = self._entradas.get(clave)
+			if entrada is None:
+				# Se descartó enseguida (presupuesto muy chico): no guardarla
+				return ctk.CTkImage(light_image=imagen, dark_image=imagen, size=(tamano, tamano))
+			if entrada[1] is None:
+				entrada[1] = ctk.CTkImage(light_image=imagen, dark_image=imagen, size=(tamano, tamano))
+			return entrada[1]
+
+	def solicitar(self, widget, ruta, tamano, listo):
+		"""Entrega la CTkImage a `listo` en el hilo de Tk.
+
+		Si la miniatura ya está en memoria se entrega enseguida; si no, se decodifica
+		en el pool de hilos y se entrega con `after` cuando está lista.
+		"""
+		clave = self.clave(ruta, tamano)
+		if clave is None:
+			return
+		with self._lock:
+			en_cache = clave in self._entradas
+			if not en_cache:
+				esperando = self._en_curso.get(clave)
+				if esperando is not None:
+					# Ya se está decodificando: solo agregar quien la espera
+					esperando.append(listo)
+					return
+				self._en_curso[clave] = [listo]
+		if en_cache:
+			listo(self.obtener(ruta, tamano))
+			return
+		if self._pool is None:
+			self._pool = concurrent.futures.ThreadPoolExecutor(self.max_hilos, thread_name_prefix="miniaturas")
+		self._pool.submit(self._decodificar, clave, ruta, tamano)
+		if not self._sondeando:
+			self._sondeando = True
+			raiz = widget.nametowidget('.')
+			raiz.after(30, self._entregar, raiz)
+
+	def _decodificar(self, clave, ruta, tamano):
+		imagen = None
+		try:
+			imagen = self.miniatura(ruta, tamano)
+		except Exception as e:
+			print(f"Error al cargar la imagen {ruta}: {e}")
+		finally:
+			# Se pasa la imagen PIL: la entrada puede desalojarse antes de que Tk la tome
+			self.listas.put((clave, ruta, tamano, imagen))
+
+	def _entregar(self, raiz):
+		"""Corre en el hilo de Tk: crea las CTkImage decodificadas y avisa a quienes las esperan.
+
+		Si la decodificación falló, `listo` recibe None.
+		"""
+		while True:
+			try:
+				clave, ruta, tamano, pil = self.listas.get_nowait()
+			except queue.Empty:
+				break
+			with self._lock:
+				esperando = self._en_curso.pop(clave, [])
+				en_cache = clave in self._entradas
+			if en_cache:
+				imagen = self.obtener(ruta, tamano)
+			elif pil is not None:
+				# Se desalojó mientras esperaba: usarla igual sin volver a guardarla
+				imagen = ctk.CTkImage(light_image=pil, dark_image=pil, size=(tamano, tamano))
+			else:
+				imagen = None
+			for listo in esperando:
+				try:
+					listo(imagen)
+				except Exception as e:
+					print(f"Error al mostrar la imagen {ruta}: {e}")
+		with self._lock:
+			pendientes = bool(self._en_curso)
+		if pendientes:
+			raiz.after(30, self._entregar, raiz)
+		else:
+			self._sondeando = False
+
+	def _liberar(self):
+		while self.memoria > self.memoria_max and len(self._entradas) > 1:
+			_, (imagen, _) = self._entradas.popitem(last=False)
+			self.memoria -= self._peso(imagen)
+
+class DerivadosImagen:
+	"""Miniaturas de tamaño fijo (JPEG y WebP) guardadas en disco para la app y la página.
+
+	Los archivos se nombran por el hash del contenido de la imagen original, así una
+	imagen repetida o renombrada reutiliza los mismos derivados; indice.json relaciona
+	la ruta que usa el catálogo ("./img/x.jpg") con ese hash.
+	"""
+	TAMANOS = (100, 150, 200, 400)
+	FORMATOS = (("jpg", "JPEG"), ("webp", "WEBP"))
+	EXTENSIONES = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+	_instance = None
+
+	@classmethod
+	def instance(cls):
+		if cls._instance is None:
+			cls._instance = cls()
+		return cls._instance
+
+	def __init__(self, directorio_html='html', carpeta='img/miniaturas', calidad=82, lado_max=1600, calidad_original=85):
+		self.directorio_html = directorio_html
+		self.directorio = os.path.join(directorio_html, carpeta)
+		self.indice_path = os.path.join(self.directorio, 'indice.json')
+		self.calidad = calidad
+		self._generando = threading.Lock()  # Una generación a la vez: no pisar temporales
+		# Imágenes que se agregan al catálogo
+		self.lado_max = lado_max
+		self.calidad_original = calidad_original
+		self._lock = threading.RLock()
+		self.indice = {}  # "img/x.jpg" -> hash del contenido
+		try:
+			with open(self.indice_path, 'r', encoding='utf-8') as archivo:
+				self.indice = json.load(archivo)
+		except FileNotFoundError:
+			pass
+		except (OSError, ValueError) as e:
+			print(f"Error al leer {self.indice_path}: {e}")
+
+	@staticmethod
+	def clave(imagen):
+		"""Ruta de la imagen relativa a html, como la escribe el catálogo pero sin './'"""
+		clave = imagen.replace('\\', '/')
+		return clave[2:] if clave.startswith('./') else clave
+
+	@staticmethod
+	def hash_archivo(ruta):
+		sha = hashlib.sha256()
+		with open(ruta, 'rb') as archivo:
+			for bloque in iter(lambda: archivo.read(1 << 16), b''):
+				sha.update(bloque)
+		return sha.hexdigest()[:20]
+
+	@staticmethod
+	def _a_rgb(imagen):
+		if imagen.mode in ("RGBA", "LA", "P"):
+			# JPEG no tiene transparencia: usar fondo blanco, como en la página
+			imagen = imagen.convert("RGBA")
+			fondo = Image.new("RGB", imagen.size, (255, 255, 255))
+			fondo.paste(imagen, mask=imagen.getchannel("A"))
+			return fondo
+		return imagen.convert("RGB")
+
+	def ingresar(self, ruta_origen):
+		"""Agrega una imagen elegida por el usuario a html/img y devuelve la ruta para el catálogo.
+
+		Se guarda como JPEG con el lado mayor limitado a `lado_max` y con el hash del
+		archivo elegido como nombre: subir otra vez la misma imagen reutiliza el archivo
+		y nunca se pisa otra imagen con el mismo nombre.
+		"""
+		nombre = f"{self.hash_archivo(ruta_origen)}.jpg"
+		destino = os.path.join(self.directorio_html, 'img', nombre)
+		imagen = f"./img/{nombre}"
+		if not os.path.exists(destino):
+			os.makedirs(os.path.dirname(destino), exist_ok=True)
+			with Image.open(ruta_origen) as original:
+				# Respetar la orientación de las fotos de celular
+				copia = self._a_rgb(ImageOps.exif_transpose(original))
+			copia.thumbnail((self.lado_max, self.lado_max), Image.LANCZOS)
+			temporal = destino + '.tmp'
+			copia.save(temporal, "JPEG", quality=self.calidad_original, optimize=True, progressive=True)
+			os.replace(temporal, destino)
+		self.generar_en_segundo_plano(imagen)
+		return imagen
+
+	def _ruta_derivado(self, hash_imagen, tamano, extension):
+		return os.path.join(self.directorio, f"{hash_imagen}_{tamano}.{extension}")
+
+	def generar(self, imagen):
+		"""Genera los derivados que falten de una imagen del catálogo y devuelve su hash"""
+		with self._generando:
+			return self._generar(imagen)
+
+	def _generar(self, imagen):
+		clave = self.clave(imagen)
+		origen = os.path.join(self.directorio_html, clave)
+		hash_imagen = self.hash_archivo(origen)
+		faltantes = [
+			tamano for tamano in self.TAMANOS
+			if not all(os.path.exists(self._ruta_derivado(hash_imagen, tamano, ext)) for ext, _ in self.FORMATOS)
+		]
+		if faltantes:
+			os.makedirs(self.directorio, exist_ok=True)
+			with Image.open(origen) as original:
+				original = self._a_rgb(original)
+			for tamano in faltantes:
+				copia = original.copy()
+				copia.thumbnail((tamano, tamano), Image.LANCZOS)
+				for extension, formato in self.FORMATOS:
+					destino = self._ruta_derivado(hash_imagen, tamano, extension)
+					temporal = destino + '.tmp'
+					copia.save(temporal, formato, quality=self.calidad)
+					os.replace(temporal, destino)
+		with self._lock:
+			if self.indice.get(clave) != hash_imagen:
+				self.indice[clave] = hash_imagen
+				os.makedirs(self.directorio, exist_ok=True)
+				escribir_atomico(
+					self.indice_path,
+					json.dumps(self.indice, indent=2, ensure_ascii=False, sort_keys=True),
+					encoding='utf-8'
+				)
+		return hash_imagen
+
+	def generar_en_segundo_plano(self, imagen):
+		def tarea():
+			try:
+				self.generar(imagen)
+			except Exception as e:
+				print(f"Error generando miniaturas de {imagen}: {e}")
+		threading.Thread(target=tarea, daemon=True).start()
+
+	def ruta(self, imagen, tamano, extension="jpg"):
+		"""Ruta absoluta del derivado más chico que cubre `tamano`, o de la original si no hay"""
+		clave = self.clave(imagen)
+		hash_imagen = self.indice.get(clave)
+		if hash_imagen:
+			tamano = next((t for t in self.TAMANOS if t >= tamano), self.TAMANOS[-1])
+			derivado = self._ruta_derivado(hash_imagen, tamano, extension)
+			if os.path.exists(derivado):
+				return os.path.abspath(derivado)
+		return os.path.abspath(os.path.join(self.directorio_html, clave))
+
+	def generar_faltantes(self):
+		"""Modo por lotes: recorre html/img y genera los derivados que falten"""
+		generadas = 0
+		raiz_img = os.path.join(self.directorio_html, 'img')
+		for carpeta, subcarpetas, archivos in os.walk(raiz_img):
+			if os.path.abspath(carpeta) == os.path.abspath(self.directorio):
+				subcarpetas[:] = []
+				continue
+			for nombre in sorted(archivos):
+				if not nombre.lower().endswith(self.EXTENSIONES):
+					continue
+				relativa = os.path.relpath(os.path.join(carpeta, nombre), self.directorio_html)
+				try:
+					self.generar(relativa)
+					generadas += 1
+				except Exception as e:
+					print(f"Error generando miniaturas de {relativa}: {e}")
+		return generadas
 
 # Configurar tema y color
 ctk.set_appearance_mode("dark")  # Temas: "dark", "light", "system"
 ctk.set_default_color_theme("blue")  # Temas: "blue", "dark-blue", "green"
 
+class Debouncer:
+	"""Agrupa llamadas seguidas (teclas en un filtro) y ejecuta solo la última.
+
+	Cada llamada cancela la ejecución pendiente y programa una nueva con `after`,
+	así el filtro corre una vez cuando el usuario deja de escribir.
+	"""
+	def __init__(self, widget, funcion, demora=250):
+		self.widget = widget
+		self.funcion = funcion
+		self.demora = demora  # Milisegundos de pausa antes de ejecutar
+		self._pendiente = None
+
+	def __call__(self, *args):
+		self.cancelar()
+		self._pendiente = self.widget.after(self.demora, self._ejecutar, *args)
+
+	def cancelar(self):
+		if self._pendiente is not None:
+			self.widget.after_cancel(self._pendiente)
+			self._pendiente = None
+
+	def ejecutar_ya(self, *args):
+		"""Ejecuta ahora descartando lo pendiente (Enter, cambio de un combo)"""
+		self.cancelar()
+		self.funcion(*args)
+
+	def _ejecutar(self, *args):
+		self._pendiente = None
+		if self.widget.winfo_exists():
+			self.funcion(*args)
+
+class FiltroIncremental:
+	"""Recuerda el último filtro aplicado y su resultado.
+
+	Si la consulta nueva es más estrecha que la anterior (más letras, un rango de
+	precios más chico, una faceta agregada) se filtra sobre el resultado anterior;
+	si se amplía, o si el catálogo cambió desde entonces, se vuelve a recorrer el
+	catálogo completo.
+	"""
+	def __init__(self, es_refinamiento):
+		self.es_refinamiento = es_refinamiento  # (estado_anterior, estado_nuevo) -> bool
+		self.reiniciar()
+
+	def reiniciar(self):
+		"""Olvidar el resultado anterior (el catálogo cambió)"""
+		self.estado = None
+		self.version = None
+		self.resultado = []
+
+	def filtrar(self, productos, estado, coincide, version=None):
+		"""`version` es la del catálogo: si cambió, el resultado anterior ya no sirve de base"""
+		if (
+			self.estado is not None and self.version == version
+			and self.es_refinamiento(self.estado, estado)
+		):
+			candidatos = self.resultado
+		else:
+			candidatos = productos
+		self.resultado = [p for p in candidatos if coincide(p)]
+		self.estado = estado
+		self.version = version
+		return self.resultado
+
+	@staticmethod
+	def faceta_refinada(anterior, nueva, todas="Todas"):
+		"""Una faceta se estrecha si antes no filtraba o si no cambió"""
+		return anterior == todas or anterior == nueva
+
+class TablaVirtual(ctk.CTkFrame):
+	"""Tabla que solo crea widgets para las filas que entran en pantalla.
+
+	Las filas se reutilizan: al desplazarse cambia el texto de las mismas etiquetas,
+	así abrirla cuesta lo mismo con cien registros que con cien mil.
+	"""
+	def __init__(self, parent, columnas, formatear_fila, alto_fila=28, filas_por_pagina=50, **kwargs):
+		super().__init__(parent, **kwargs)
+		self.columnas = columnas
+		self.formatear_fila = formatear_fila  # registro -> tupla de textos, una por columna
+		self.alto_fila = alto_fila
+		self.filas_por_pagina = filas_por_pagina
+		self.datos = []
+		self.inicio = 0  # Índice del primer registro visible
+		self.filas = []  # Pool de filas: (frame, [labels])
+		self.visibles = 1  # Filas que entran completas en el cuerpo
+
+		# Encabezados
+		header_frame = ctk.CTkFrame(self)
+		header_frame.pack(fill="x", padx=5, pady=(5, 0))
+		header_frame.grid_columnconfigure(tuple(range(len(columnas))), weight=1, uniform="column")
+		for i, columna in enumerate(columnas):
+			ctk.CTkLabel(header_frame, text=columna, font=("Helvetica", 14, "bold")).grid(row=0, column=i, padx=5, pady=2, sticky="ew")
+
+		# Controles de página
+		paginas_frame = ctk.CTkFrame(self)
+		paginas_frame.pack(side="bottom", fill="x", padx=5, pady=5)
+		ctk.CTkButton(paginas_frame, text="◀ Anterior", width=100, command=lambda: self.desplazar(-self.filas_por_pagina)).pack(side="left", padx=5)
+		ctk.CTkButton(paginas_frame, text="Siguiente ▶", width=100, command=lambda: self.desplazar(self.filas_por_pagina)).pack(side="left", padx=5)
+		self.pagina_label = ctk.CTkLabel(paginas_frame, text="")
+		self.pagina_label.pack(side="left", padx=10)
+		ctk.CTkButton(paginas_frame, text="Ir", width=40, command=self._ir_a_pagina).pack(side="right", padx=5)
+		self.entry_pagina = ctk.CTkEntry(paginas_frame, width=60)
+		self.entry_pagina.pack(side="right", padx=5)
+		self.entry_pagina.bind("<Return>", lambda e: self._ir_a_pagina())
+		ctk.CTkLabel(paginas_frame, text="Ir a página:").pack(side="right", padx=5)
+
+		# Cuerpo con barra de desplazamiento propia
+		self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+		self.scrollbar.pack(side="right", fill="y")
+		self.cuerpo = ctk.CTkFrame(self, fg_color="transparent")
+		self.cuerpo.pack(fill="both", expand=True, padx=5, pady=5)
+		self.cuerpo.bind("<Configure>", self._on_resize)
+		self._bind_rueda(self.cuerpo)
+
+	def _bind_rueda(self, widget):
+		widget.bind("<MouseWheel>", lambda e: self.desplazar(-1 if e.delta > 0 else 1))
+		widget.bind("<Button-4>", lambda e: self.desplazar(-1))
+		widget.bind("<Button-5>", lambda e: self.desplazar(1))
+
+	def _on_resize(self, event):
+		# Ajustar el pool a la cantidad de filas que entran (más una parcialmente visible).
+		# event.height está en píxeles reales: el paso incluye el escalado y el pady=1 de cada fila.
+		paso = self._apply_widget_scaling(self.alto_fila) + 2 * self._apply_widget_scaling(1)
+		self.visibles = max(1, int(event.height // paso))
+		necesarias = self.visibles + 1
+		while len(self.filas) < necesarias:
+			self.filas.append(self._crear_fila())
+		while len(self.filas) > necesarias:
+			frame, _ = self.filas.pop()
+			frame.destroy()
+		self.refrescar()
+
+	def _crear_fila(self):
+		frame = ctk.CTkFrame(self.cuerpo, height=self.alto_fila)
+		frame.pack(fill="x", pady=1)
+		frame.pack_propagate(False)
+		frame.grid_propagate(False)
+		frame.grid_columnconfigure(tuple(range(len(self.columnas))), weight=1, uniform="column")
+		frame.grid_rowconfigure(0, weight=1)
+		labels = []
+		for i in range(len(self.columnas)):
+			label = ctk.CTkLabel(frame, text="", anchor="w")
+			label.grid(row=0, column=i, padx=5, sticky="ew")
+			self._bind_rueda(label)
+			labels.append(label)
+		self._bind_rueda(frame)
+		return frame, labels
+
+	def set_datos(self, datos):
+		self.datos = datos
+		self.inicio = 0
+		self.refrescar()
+
+	def desplazar(self, filas):
+		self.inicio += filas
+		self.refrescar()
+
+	def _ir_a_pagina(self):
+		try:
+			pagina = int(self.entry_pagina.get())
+		except ValueError:
+			return
+		self.inicio = (pagina - 1) * self.filas_por_pagina
+		self.refrescar()
+
+	def _on_scrollbar(self, accion, valor, unidad=None):
+		if accion == "moveto":
+			self.inicio = int(float(valor) * len(self.datos))
+		elif accion == "scroll":
+			paso = self.visibles if unidad == "pages" else 1
+			self.inicio += int(valor) * paso
+		self.refrescar()
+
+	def refrescar(self):
+		visibles = self.visibles
+		self.inicio = max(0, min(self.inicio, len(self.datos) - visibles))
+		for i, (frame, labels) in enumerate(self.filas):
+			indice = self.inicio + i
+			if indice < len(self.datos):
+				for label, texto in zip(labels, self.formatear_fila(self.datos[indice])):
+					label.configure(text=texto)
+			else:
+				for label in labels:
+					label.configure(text="")
+		total = len(self.datos)
+		if total:
+			self.scrollbar.set(self.inicio / total, min(1.0, (self.inicio + visibles) / total))
+		else:
+			self.scrollbar.set(0, 1)
+		paginas = max(1, math.ceil(total / self.filas_por_pagina))
+		pagina = min(paginas, self.inicio // self.filas_por_pagina + 1)
+		self.pagina_label.configure(text=f"Página {pagina} de {paginas} ({total} registros)")
+
+class GrillaVirtual(ctk.CTkFrame):
+	"""Grilla de tarjetas que solo crea las que entran en pantalla.
+
+	Igual que TablaVirtual, las tarjetas se reutilizan al desplazarse: cada una recibe
+	el producto que le toca mostrar en lugar de crearse una por producto.
+	"""
+	def __init__(self, parent, crear_tarjeta, llenar_tarjeta, columnas=4, alto_tarjeta=390,
+				 texto_vacio="", **kwargs):
+		super().__init__(parent, **kwargs)
+		self.crear_tarjeta = crear_tarjeta  # parent -> tarjeta
+		self.llenar_tarjeta = llenar_tarjeta  # (tarjeta, dato) -> None
+		self.columnas = columnas
+		self.alto_tarjeta = alto_tarjeta
+		self.datos = []
+		self.inicio = 0  # Índice de la primera fila de tarjetas visible
+		self.filas = []  # Pool de filas: (frame, [tarjetas])
+		self.visibles = 1  # Filas de tarjetas que entran completas
+
+		self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+		self.scrollbar.pack(side="right", fill="y")
+		self.cuerpo = ctk.CTkFrame(self, fg_color="transparent")
+		self.cuerpo.pack(fill="both", expand=True, padx=5, pady=5)
+		self.cuerpo.bind("<Configure>", self._on_resize)
+		self._bind_rueda(self.cuerpo)
+
+		self.vacio_label = ctk.CTkLabel(self.cuerpo, text=texto_vacio, font=("", 16, "bold"), text_color="red")
+
+	def _bind_rueda(self, widget):
+		widget.bind("<MouseWheel>", lambda e: self.desplazar(-1 if e.delta > 0 else 1))
+		widget.bind("<Button-4>", lambda e: self.desplazar(-1))
+		widget.bind("<Button-5>", lambda e: self.desplazar(1))
+		for hijo in widget.winfo_children():
+			self._bind_rueda(hijo)
+
+	def _on_resize(self, event):
+		# Ajustar el pool a las filas que entran (más una parcialmente visible).
+		# event.height está en píxeles reales, así que el alto de fila se escala igual que el frame
+		paso = self._apply_widget_scaling(self.alto_tarjeta)
+		self.visibles = max(1, int(event.height // paso))
+		necesarias = self.visibles + 1
+		while len(self.filas) < necesarias:
+			self.filas.append(self._crear_fila())
+		while len(self.filas) > necesarias:
+			frame, _ = self.filas.pop()
+			frame.destroy()
+		self.refrescar()
+
+	def _crear_fila(self):
+		frame = ctk.CTkFrame(self.cuerpo, fg_color="transparent", height=self.alto_tarjeta)
+		frame.pack(fill="x")
+		frame.grid_propagate(False)
+		frame.grid_columnconfigure(tuple(range(self.columnas)), weight=1, uniform="column")
+		frame.grid_rowconfigure(0, weight=1)
+		tarjetas = []
+		for col in range(self.columnas):
+			tarjeta = self.crear_tarjeta(frame)
+			tarjeta.grid(row=0, column=col, padx=10, pady=10, sticky="nsew")
+			tarjetas.append(tarjeta)
+		self._bind_rueda(frame)
+		return frame, tarjetas
+
+	def total_filas(self):
+		return math.ceil(len(self.datos) / self.columnas)
+
+	def set_datos(self, datos):
+		self.datos = datos
+		self.inicio = 0
+		self.refrescar()
+
+	def desplazar(self, filas):
+		self.inicio += filas
+		self.refrescar()
+
+	def _on_scrollbar(self, accion, valor, unidad=None):
+		if accion == "moveto":
+			self.inicio = int(float(valor) * self.total_filas())
+		elif accion == "scroll":
+			paso = self.visibles if unidad == "pages" else 1
+			self.inicio += int(valor) * paso
+		self.refrescar()
+
+	def refrescar(self):
+		visibles = self.visibles
+		total = self.total_filas()
+		self.inicio = max(0, min(self.inicio, total - visibles))
+		for i, (_, tarjetas) in enumerate(self.filas):
+			for col, tarjeta in enumerate(tarjetas):
+				indice = (self.inicio + i) * self.columnas + col
+				if indice < len(self.datos):
+					self.llenar_tarjeta(tarjeta, self.datos[indice])
+					tarjeta.grid()
+				else:
+					tarjeta.grid_remove()
+		if self.datos:
+			self.vacio_label.place_forget()
+		else:
+			self.vacio_label.place(relx=0.5, y=30, anchor="n")
+			self.vacio_label.lift()
+		if total:
+			self.scrollbar.set(self.inicio / total, min(1.0, (self.inicio + visibles) / total))
+		else:
+			self.scrollbar.set(0, 1)
+
 class App(ctk.CTk):
 	def __init__(self):
 		super().__init__()
@@ -260,6 +1746,9 @@ class App(ctk.CTk):
 
 		# Inicializar modo_venta como None para evitar errores de atributo
 		self.modo_venta = None
+
+		# Ventanas que se ocultan al cerrarlas y se reutilizan (una por tipo)
+		self.dialogos = {}
 		
 		# Configurar ventana principal
 		self.geometry(f"{self.winfo_screenwidth()}x{self.winfo_screenheight()}")
@@ -287,30 +1776,52 @@ class App(ctk.CTk):
 		
 		self.show_login()
 		
-		# Cargar imagen de fondo	
+		# Cargar imagen de fondo (se decodifica una sola vez por sesión)
+		self.fondos = collections.OrderedDict()  # (ancho, alto) redondeados -> CTkImage
+		self.max_fondos = 8
+		self.redimensionar_fondo = Debouncer(self, self.actualizar_imagen_fondo, demora=150)
 		try:
 			self.original_image = Image.open("html/img/Logo.jpeg")
+			self.original_image.load()
 			self.actualizar_imagen_fondo()
 			self.bind('<Configure>', self.on_resize)
 		except Exception as e:
 			print(f"Error al cargar la imagen de fondo: {e}")
 		
+		# Estado de las publicaciones que corren en segundo plano
+		self.after(500, self.revisar_publicacion)
+		
 		# Mostrar login al inicio
 		self.state("zoomed")  # Iniciar maximizado	
 
+	# Los tamaños se redondean a múltiplos de este paso para reutilizar el fondo escalado
+	PASO_FONDO = 64
+
 	def actualizar_imagen_fondo(self):
 		window_width = self.background_frame.winfo_width()
 		window_height = self.background_frame.winfo_height()
 		
 		if window_width > 1 and window_height > 1:
-			imagen_fondo = self.original_image.copy()
-			imagen_fondo.thumbnail((window_width, window_height))
+			paso = self.PASO_FONDO
+			tamano = (max(paso, round(window_width / paso) * paso), max(paso, round(window_height / paso) * paso))
+			bg_image = self.fondos.get(tamano)
+			if bg_image is None:
+				imagen_fondo = self.original_image.copy()
+				imagen_fondo.thumbnail(tamano)
+				bg_image = ctk.CTkImage(
+					light_image=imagen_fondo,
+					dark_image=imagen_fondo,
+					size=tamano
+				)
+				self.fondos[tamano] = bg_image
+				while len(self.fondos) > self.max_fondos:
+					self.fondos.popitem(last=False)
+			else:
+				self.fondos.move_to_end(tamano)
 			
-			self.bg_image = ctk.CTkImage(
-				light_image=imagen_fondo,
-				dark_image=imagen_fondo,
-				size=(window_width, window_height)
-			)
+			if getattr(self, 'bg_image', None) is bg_image:
+				return  # Mismo tamaño redondeado: no hay nada que cambiar
+			self.bg_image = bg_image
 			
 			if hasattr(self, 'bg_label'):
 				self.bg_label.configure(image=self.bg_image)
@@ -323,8 +1834,21 @@ class App(ctk.CTk):
 				self.bg_label.place(relx=0.5, rely=0.5, anchor="center")
 
 	def on_resize(self, event=None):
+		# Mientras se arrastra el borde llegan muchos eventos: escalar solo al soltar
 		if event.widget == self:
-			self.actualizar_imagen_fondo()
+			self.redimensionar_fondo()
+
+	def revisar_publicacion(self):
+		# El hilo de publicación no toca widgets: deja los mensajes en una cola que se lee acá
+		texto = None
+		try:
+			while True:
+				texto = PublicadorGit.instance().estados.get_nowait()
+		except queue.Empty:
+			pass
+		if texto and hasattr(self, 'estado_publicacion_label') and self.estado_publicacion_label.winfo_exists():
+			self.estado_publicacion_label.configure(text=texto)
+		self.after(500, self.revisar_publicacion)
 
 	def create_menu(self):
 		# Destruir el menú anterior si existe
@@ -367,6 +1891,20 @@ class App(ctk.CTk):
 				font=self.font_normal
 			).pack(side="left", padx=5)
 
+			ctk.CTkButton(
+				self.menu_frame,
+				text="Estadísticas",
+				command=self.show_estadisticas,
+				font=self.font_normal
+			).pack(side="left", padx=5)
+
+			ctk.CTkButton(
+				self.menu_frame,
+				text="Métricas Git",
+				command=self.show_metricas_git,
+				font=self.font_normal
+			).pack(side="left", padx=5)
+
 		ctk.CTkButton(
 			self.menu_frame,
 			text="Lista de Precios",
@@ -392,9 +1930,18 @@ class App(ctk.CTk):
 			fg_color="red"
 		).pack(side="right", padx=5)
 
+		# Estado de la última publicación en GitHub
+		self.estado_publicacion_label = ctk.CTkLabel(
+			self.menu_frame,
+			text="",
+			font=self.font_small
+		)
+		self.estado_publicacion_label.pack(side="right", padx=10)
+
 	def logout(self):
 		self.is_admin = False
 		self.is_empleado = False
+		self.cerrar_dialogos()
 		self.menu_frame.destroy()  # Destruir el menú actual
 		self.show_login()          # Volver a mostrar el login
 
@@ -412,21 +1959,60 @@ class App(ctk.CTk):
 			return
 		ProductoDialog(self)
 
+	def mostrar_dialogo(self, clase):
+		"""Muestra la ventana de ese tipo: la crea la primera vez y después la reutiliza.
+
+		Al cerrarla solo se oculta; al reabrirla se actualiza si el catálogo (o el
+		historial) cambió mientras estaba oculta.
+		"""
+		dialogo = self.dialogos.get(clase)
+		if dialogo is None or not dialogo.winfo_exists():
+			dialogo = clase(self)
+			dialogo.protocol("WM_DELETE_WINDOW", dialogo.withdraw)
+			self.dialogos[clase] = dialogo
+		else:
+			dialogo.refrescar_si_cambio()
+			dialogo.deiconify()
+			dialogo.lift()
+			dialogo.focus_force()
+		return dialogo
+
+	def cerrar_dialogos(self):
+		for dialogo in self.dialogos.values():
+			if dialogo.winfo_exists():
+				dialogo.destroy()
+		self.dialogos.clear()
+
 	def show_ver_productos(self):
-		VerProductosDialog(self)
+		self.mostrar_dialogo(VerProductosDialog)
 			
 	def toggle_modo_venta(self):
 		#if self.modo_venta.get():
 		ModoVentaDialog(self)
 
 	def show_lista_precios(self):
-		ListaPreciosDialog(self)
+		self.mostrar_dialogo(ListaPreciosDialog)
 
 	def show_historial(self):
 		if not self.is_admin:
 			messagebox.showerror("Error", "Acceso denegado. Se requieren permisos de administrador.")
 			return
-		HistorialDialog(self)
+		self.mostrar_dialogo(HistorialDialog)
+
+	def show_estadisticas(self):
+		if not self.is_admin:
+			messagebox.showerror("Error", "Acceso denegado. Se requieren permisos de administrador.")
+			return
+		if np is None:
+			messagebox.showerror("Error", "Las estadísticas necesitan numpy instalado (pip install numpy).")
+			return
+		EstadisticasDialog(self)
+
+	def show_metricas_git(self):
+		if not self.is_admin:
+			messagebox.showerror("Error", "Acceso denegado. Se requieren permisos de administrador.")
+			return
+		MetricasGitDialog(self)
 
 	def show_login(self):
 		dialog = LoginDialog(self)
@@ -458,97 +2044,82 @@ class VerProductosDialog(ctk.CTkToplevel):
 		self.focus_force()  # Forzar el foco
 
 		self.productos = []
-		self.productos_seleccionados = []
+		self.seleccionados = set()  # ids de los productos seleccionados
+		# Imagen provisoria mientras se decodifica la del producto (o si no tiene);
+		# hace falta una porque configure(image=None) no borra la anterior
+		try:
+			self._imagen_vacia = CacheMiniaturas.instance().obtener(os.path.abspath(os.path.join('html', 'img', 'placeholder.png')), 200)
+		except Exception as e:
+			print(f"Error al cargar la imagen provisoria: {e}")
+			self._imagen_vacia = None
+		if self._imagen_vacia is None:
+			vacia = Image.new("RGBA", (200, 200), (0, 0, 0, 0))
+			self._imagen_vacia = ctk.CTkImage(light_image=vacia, dark_image=vacia, size=(200, 200))
 
 		self.main_frame = ctk.CTkFrame(self)
 		self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
 		self.crear_filtros()
 
-		self.productos_frame = ctk.CTkScrollableFrame(self.main_frame)
+		# Solo se crean las tarjetas visibles; se reutilizan al desplazarse
+		self.productos_frame = GrillaVirtual(
+			self.main_frame,
+			crear_tarjeta=self.crear_producto_card,
+			llenar_tarjeta=self.llenar_producto_card,
+			columnas=4,
+			texto_vacio="No hay productos para los filtros aplicados."
+		)
 		self.productos_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
 		# Guardar productos filtrados actuales
 		self._productos_filtrados = []
+		self.filtro = FiltroIncremental(self._es_refinamiento)
 
 		self.cargar_productos()
 
 	def cargar_productos(self):
-		try:
-			with open('html/JS/productos.json', 'r') as archivo:
-				self.productos = json.load(archivo)
-				self._productos_filtrados = self.productos
-				self.mostrar_productos(self.productos)
-		except FileNotFoundError:
-			self.productos = []
-			messagebox.showerror("Error", "No se encontró el archivo de productos")
+		self.productos = DataManager.instance().productos
+		self.version_catalogo = DataManager.instance().version
+		self._productos_filtrados = self.productos
+		self.filtro.reiniciar()
+		self.mostrar_productos(self.productos)
+
+	def refrescar_si_cambio(self):
+		"""Al reabrir la ventana: volver a aplicar los filtros solo si el catálogo cambió"""
+		if self.version_catalogo == DataManager.instance().version:
+			return
+		self.productos = DataManager.instance().productos
+		self.version_catalogo = DataManager.instance().version
+		self.filtro.reiniciar()
+		# La grilla reutiliza sus tarjetas: solo se vuelven a llenar las visibles
+		self.aplicar_filtros()
 
 	def mostrar_productos(self, productos_filtrados):
-		try:
-			# Limpiar el frame anterior
-			for widget in self.productos_frame.winfo_children():
-				widget.destroy()
-
-			# Guardar productos filtrados actuales
-			self._productos_filtrados = productos_filtrados
-
-			columnas = 4  # Fijo: 4 columnas
-			for col in range(columnas):
-				self.productos_frame.grid_columnconfigure(col, weight=1, uniform="column")
-			self.productos_seleccionados = []
-			row = 0
-			col = 0
-
-			for producto in productos_filtrados:
-				try:
-					if not producto.get('es_variante', False):
-						card = self.crear_producto_card(self.productos_frame, producto)
-						card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-						col += 1
-						if col >= columnas:
-							col = 0
-							row += 1
-				except Exception as e:
-					print(f"Error mostrando producto: {producto}\n{e}")
-
-			# --- Agrega este bloque al final ---
-			if not productos_filtrados:
-				label = ctk.CTkLabel(
-					self.productos_frame,
-					text="No hay productos para los filtros aplicados.",
-					font=("", 16, "bold"),
-					text_color="red"
-				)
-				label.grid(row=0, column=0, padx=10, pady=30, columnspan=columnas, sticky="nsew")
-		except Exception as e:
-			print(f"Error en mostrar_productos: {e}")
-
-		# --- Agrega este bloque al final ---
-		if not productos_filtrados:
-			label = ctk.CTkLabel(
-				self.productos_frame,
-				text="No hay productos para los filtros aplicados.",
-				font=("", 16, "bold"),
-				text_color="red"
-			)
-			label.grid(row=0, column=0, padx=10, pady=30, columnspan=columnas, sticky="nsew")
+		# Guardar productos filtrados actuales
+		self._productos_filtrados = productos_filtrados
+		# Descartar selecciones de productos que ya no existen
+		self.seleccionados &= {p['id'] for p in self.productos}
+		self.productos_frame.set_datos([p for p in productos_filtrados if not p.get('es_variante', False)])
 
 	def crear_filtros(self):
 		filtro_frame = ctk.CTkFrame(self.main_frame)
 		filtro_frame.pack(fill="x", padx=10, pady=5)
+
+		# Los campos de texto filtran cuando se deja de escribir, no en cada tecla
+		self.filtrar_al_escribir = Debouncer(self, self.aplicar_filtros)
 		
 		# Nombre
 		ctk.CTkLabel(filtro_frame, text="Nombre").pack(side="left", padx=5)
 		self.filtro_nombre = ctk.CTkEntry(filtro_frame)
 		self.filtro_nombre.pack(side="left", padx=5)
-		self.filtro_nombre.bind('<KeyRelease>', lambda e: self.aplicar_filtros())
+		self.filtro_nombre.bind('<KeyRelease>', lambda e: self.filtrar_al_escribir())
 		
 		# Categoría
 		ctk.CTkLabel(filtro_frame, text="Categoría").pack(side="left", padx=5)
 		self.filtro_categoria = ctk.CTkOptionMenu(
 			filtro_frame,
 			values=["Todas", "Indumentaria", "Accesorios", "Remeras", "Pantalones", "Abrigos", "Marroquineria", "Bolsos", "Pelotas"],
-			command=lambda x: self.aplicar_filtros()
+			command=lambda x: self.filtrar_al_escribir.ejecutar_ya()
 		)
 		self.filtro_categoria.pack(side="left", padx=5)
 		
@@ -558,7 +2129,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 			filtro_frame,
 			values=["Todas", "Futbol", "Basquet", "Tenis", "Natacion", "Running", 
 					"Boxeo", "Voley", "Rugby", "Hockey", "Yoga", "Fitness", "Musculacion"],
-			command=lambda x: self.aplicar_filtros()
+			command=lambda x: self.filtrar_al_escribir.ejecutar_ya()
 		)
 		self.filtro_disciplina.pack(side="left", padx=5)
 		
@@ -567,7 +2138,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 		self.filtro_genero = ctk.CTkOptionMenu(
 			filtro_frame,
 			values=["Todos", "Femenino", "Masculino", "Niño", "Niña", "Unisex", "No"],
-			command=lambda x: self.aplicar_filtros()
+			command=lambda x: self.filtrar_al_escribir.ejecutar_ya()
 		)
 		self.filtro_genero.pack(side="left", padx=5)
 		
@@ -576,7 +2147,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 		self.filtro_talle = ctk.CTkOptionMenu(
 			filtro_frame,
 			values=["Todos", "No", "S", "M", "L", "XL"],
-			command=lambda x: self.aplicar_filtros()
+			command=lambda x: self.filtrar_al_escribir.ejecutar_ya()
 		)
 		self.filtro_talle.pack(side="left", padx=5)
 		
@@ -584,13 +2155,13 @@ class VerProductosDialog(ctk.CTkToplevel):
 		ctk.CTkLabel(filtro_frame, text="Precio Mínimo").pack(side="left", padx=5)
 		self.filtro_precio_min = ctk.CTkEntry(filtro_frame)
 		self.filtro_precio_min.pack(side="left", padx=5)
-		self.filtro_precio_min.bind('<KeyRelease>', lambda e: self.aplicar_filtros())
+		self.filtro_precio_min.bind('<KeyRelease>', lambda e: self.filtrar_al_escribir())
 		
 		# Precio Máximo
 		ctk.CTkLabel(filtro_frame, text="Precio Máximo").pack(side="left", padx=5)
 		self.filtro_precio_max = ctk.CTkEntry(filtro_frame)
 		self.filtro_precio_max.pack(side="left", padx=5)
-		self.filtro_precio_max.bind('<KeyRelease>', lambda e: self.aplicar_filtros())
+		self.filtro_precio_max.bind('<KeyRelease>', lambda e: self.filtrar_al_escribir())
 
 		# Frame para botones de acción
 		botones_frame = ctk.CTkFrame(self.main_frame)
@@ -635,6 +2206,19 @@ class VerProductosDialog(ctk.CTkToplevel):
 		)
 		self.precio_seleccionado_label.pack(side="right", padx=10)
 
+	@staticmethod
+	def _es_refinamiento(anterior, nuevo):
+		nombre_a, categoria_a, disciplina_a, genero_a, talle_a, min_a, max_a = anterior
+		nombre, categoria, disciplina, genero, talle, precio_min, precio_max = nuevo
+		return (
+			nombre_a in nombre and
+			FiltroIncremental.faceta_refinada(categoria_a, categoria) and
+			FiltroIncremental.faceta_refinada(disciplina_a, disciplina) and
+			FiltroIncremental.faceta_refinada(genero_a, genero, "Todos") and
+			FiltroIncremental.faceta_refinada(talle_a, talle, "Todos") and
+			precio_min >= min_a and precio_max <= max_a
+		)
+
 	def aplicar_filtros(self, *args):
 		try:
 			nombre = self.filtro_nombre.get().lower()
@@ -644,20 +2228,25 @@ class VerProductosDialog(ctk.CTkToplevel):
 			talle = self.filtro_talle.get()
 			
 			# Obtener precios con valores por defecto
-			precio_min = self.filtro_precio_min.get() or "0"  # Si está vacío, usa "0"
-			precio_max = self.filtro_precio_max.get() or "999999999"  # Si está vacío, usa "999999999"
+			precio_min = float(self.filtro_precio_min.get() or "0")  # Si está vacío, usa "0"
+			precio_max = float(self.filtro_precio_max.get() or "999999999")  # Si está vacío, usa "999999999"
 			
-			# Filtrar productos
-			productos_filtrados = [p for p in self.productos if
-				nombre in p['titulo'].lower() and
-				(categoria == "Todas" or 
-				 categoria.upper() == p['categoria']['nombre'] or 
-				 categoria.lower() in p['categoria_general'].lower()) and
-				(disciplina == "Todas" or disciplina.lower() == p.get('disciplina', '').lower()) and
-				(genero == "Todos" or genero.lower() == p.get('genero', '').lower()) and
-				(talle == "Todos" or talle in p.get('talles', [])) and
-				float(p['precio']) >= float(precio_min) and
-				float(p['precio']) <= float(precio_max)]
+			def coincide(p):
+				return (
+					nombre in p['titulo'].lower() and
+					(categoria == "Todas" or 
+					 categoria.upper() == p['categoria']['nombre'] or 
+					 categoria.lower() in p['categoria_general'].lower()) and
+					(disciplina == "Todas" or disciplina.lower() == p.get('disciplina', '').lower()) and
+					(genero == "Todos" or genero.lower() == p.get('genero', '').lower()) and
+					(talle == "Todos" or talle in p.get('talles', [])) and
+					float(p['precio']) >= precio_min and
+					float(p['precio']) <= precio_max
+				)
+
+			# Filtrar productos (sobre el resultado anterior si la consulta se achicó)
+			estado = (nombre, categoria, disciplina, genero, talle, precio_min, precio_max)
+			productos_filtrados = self.filtro.filtrar(self.productos, estado, coincide, DataManager.instance().version)
 				
 			# Actualizar vista
 			self.mostrar_productos(productos_filtrados)
@@ -665,35 +2254,20 @@ class VerProductosDialog(ctk.CTkToplevel):
 		except ValueError as e:
 			print(f"Error al aplicar filtros: {e}")
 
-	def crear_producto_card(self, parent, producto):
-		# Crear frame para la card
+	def crear_producto_card(self, parent):
+		"""Crea una tarjeta vacía; llenar_producto_card le asigna el producto a mostrar"""
 		card = ctk.CTkFrame(parent)
+		card.producto = None
+		card.imagen_ruta = ""  # Ruta de la imagen mostrada o pedida
+		card.grid_propagate(False)
+		card.pack_propagate(False)
 		
 		# Frame para imagen
-		img_frame = ctk.CTkFrame(card)
+		img_frame = ctk.CTkFrame(card, height=210)
 		img_frame.pack(fill="x", padx=5, pady=5)
-		
-		# Imagen del producto
-		if producto['imagen']:
-			try:
-				ruta_absoluta = os.path.abspath(os.path.join('html', producto['imagen'].replace('./', '')))
-				if os.path.exists(ruta_absoluta):
-					# Usar CTkImage en lugar de PhotoImage
-					pil_image = Image.open(ruta_absoluta)
-					pil_image.thumbnail((200, 200))
-					ctk_image = ctk.CTkImage(
-						light_image=pil_image,
-						dark_image=pil_image,
-						size=(200, 200)
-					)
-					imagen_label = ctk.CTkLabel(
-						img_frame, 
-						image=ctk_image, 
-						text=""
-					)
-					imagen_label.pack(expand=True, fill="both")
-			except Exception as e:
-				print(f"Error al cargar la imagen {producto['imagen']}: {e}")
+		img_frame.pack_propagate(False)
+		card.imagen_label = ctk.CTkLabel(img_frame, text="")
+		card.imagen_label.pack(expand=True, fill="both")
 		
 		# Frame para información
 		info_frame = ctk.CTkFrame(card)
@@ -703,21 +2277,22 @@ class VerProductosDialog(ctk.CTkToplevel):
 		header_frame = ctk.CTkFrame(info_frame)
 		header_frame.pack(fill="x", pady=2)
 		
-		var = ctk.BooleanVar()
-		self.productos_seleccionados.append((producto, var))
-		ctk.CTkCheckBox(header_frame, text="", variable=var).pack(side="left", padx=5)
-		ctk.CTkLabel(header_frame, text=producto['titulo'], font=("", 14, "bold")).pack(side="left")
+		card.checkbox = ctk.CTkCheckBox(header_frame, text="", width=24, command=lambda c=card: self.alternar_seleccion(c))
+		card.checkbox.pack(side="left", padx=5)
+		card.titulo_label = ctk.CTkLabel(header_frame, text="", font=("", 14, "bold"), anchor="w")
+		card.titulo_label.pack(side="left", fill="x", expand=True)
 		
 		# Información del producto
-		ctk.CTkLabel(info_frame, text=f"Precio: ${producto['precio']}").pack(anchor="w")
-		ctk.CTkLabel(info_frame, text=f"Stock: {producto.get('stock', 0)}").pack(anchor="w")
+		card.precio_label = ctk.CTkLabel(info_frame, text="")
+		card.precio_label.pack(anchor="w")
+		card.stock_label = ctk.CTkLabel(info_frame, text="")
+		card.stock_label.pack(anchor="w")
 		
 		# Color con indicador visual
 		color_frame = ctk.CTkFrame(info_frame)
 		color_frame.pack(fill="x", pady=2)
-		color_name = producto.get('color', 'No especificado')
-		color_label = ctk.CTkLabel(color_frame, text=f"Color: {color_name}")
-		color_label.pack(side="left")
+		card.color_label = ctk.CTkLabel(color_frame, text="")
+		card.color_label.pack(side="left")
 		
 		# Frame para botones
 		botones_frame = ctk.CTkFrame(card)
@@ -727,33 +2302,78 @@ class VerProductosDialog(ctk.CTkToplevel):
 		ctk.CTkButton(
 			botones_frame,
 			text="Modificar",
-			command=lambda p=producto: self.modificar_producto(p),
+			command=lambda c=card: self.modificar_producto(c.producto),
 			fg_color="green"
 		).pack(side="left", padx=2, expand=True)
 		
 		ctk.CTkButton(
 			botones_frame,
 			text="Eliminar",
-			command=lambda p=producto: self.eliminar_producto(p),
+			command=lambda c=card: self.eliminar_producto(c.producto),
 			fg_color="red"
 		).pack(side="left", padx=2, expand=True)
 		
 		ctk.CTkButton(
 			botones_frame,
 			text="Stock",
-			command=lambda p=producto: self.actualizar_stock(p),
+			command=lambda c=card: self.actualizar_stock(c.producto),
 			fg_color="blue"
 		).pack(side="left", padx=2, expand=True)
 		
 		return card
 
+	def _cargar_imagen_card(self, card, producto):
+		ruta_absoluta = None
+		if producto['imagen']:
+			# Derivado de 200 px si ya se generó
+			ruta_absoluta = DerivadosImagen.instance().ruta(producto['imagen'], 200)
+		if card.imagen_ruta == ruta_absoluta:
+			return  # Ya la muestra (o ya la pidió)
+		# La tarjeta se muestra enseguida con la imagen provisoria; la del producto
+		# se decodifica en segundo plano y se coloca cuando está lista
+		card.imagen_label.configure(image=self._imagen_vacia)
+		card.imagen_ruta = ruta_absoluta
+		if ruta_absoluta is None:
+			return
+
+		def listo(ctk_image, card=card, ruta=ruta_absoluta):
+			# La tarjeta pudo reutilizarse para otro producto mientras tanto
+			if ctk_image is not None and card.winfo_exists() and card.imagen_ruta == ruta:
+				card.imagen_label.configure(image=ctk_image)
+
+		CacheMiniaturas.instance().solicitar(self, ruta_absoluta, 200, listo)
+
+	def llenar_producto_card(self, card, producto):
+		card.producto = producto
+		self._cargar_imagen_card(card, producto)
+		card.titulo_label.configure(text=producto['titulo'])
+		card.precio_label.configure(text=f"Precio: ${producto['precio']}")
+		card.stock_label.configure(text=f"Stock: {producto.get('stock', 0)}")
+		card.color_label.configure(text=f"Color: {producto.get('color', 'No especificado')}")
+		# La selección vive en el modelo, no en la tarjeta
+		if producto['id'] in self.seleccionados:
+			card.checkbox.select()
+		else:
+			card.checkbox.deselect()
+
+	def alternar_seleccion(self, card):
+		if card.producto is None:
+			return
+		if card.checkbox.get():
+			self.seleccionados.add(card.producto['id'])
+		else:
+			self.seleccionados.discard(card.producto['id'])
+
+	def productos_seleccionados(self):
+		return [p for p in self.productos if p['id'] in self.seleccionados]
+
 	def seleccionar_todos(self):
-		for _, var in self.productos_seleccionados:
-			var.set(True)
+		self.seleccionados.update(p['id'] for p in self.productos_frame.datos)
+		self.productos_frame.refrescar()
 
 	def deseleccionar_todos(self):
-		for _, var in self.productos_seleccionados:
-			var.set(False)
+		self.seleccionados.clear()
+		self.productos_frame.refrescar()
 
 	def actualizar_stock(self, producto):
 		dialog = ctk.CTkToplevel(self)
@@ -789,20 +2409,8 @@ class VerProductosDialog(ctk.CTkToplevel):
 						messagebox.showerror("Error", "El stock no puede ser menor a 0")
 						return
 					
-					producto['stock'] = nuevo_stock
-					
-					# Actualizar el archivo JSON
-					with open('html/JS/productos.json', 'r') as archivo:
-						productos = json.load(archivo)
-					
-					# Encontrar y actualizar el producto
-					for i, p in enumerate(productos):
-						if p['id'] == producto['id']:
-							productos[i] = producto
-							break
-					
-					with open('html/JS/productos.json', 'w') as archivo:
-						json.dump(productos, archivo, indent=2)
+					# Actualizar el catálogo compartido
+					DataManager.instance().ajustar_stock([(producto['id'], cantidad)])
 					
 					messagebox.showinfo("Información", "Stock actualizado correctamente.")
 					dialog.destroy()
@@ -821,7 +2429,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 
 	def actualizar_precios_seleccionados(self):
 		# Verificar si hay productos seleccionados
-		productos_a_actualizar = [(p, v) for p, v in self.productos_seleccionados if v.get()]
+		productos_a_actualizar = self.productos_seleccionados()
 		
 		if not productos_a_actualizar:
 			messagebox.showwarning("Advertencia", "No hay productos seleccionados")
@@ -883,7 +2491,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 		productos_frame.pack(fill="both", expand=True, padx=20, pady=5)
 		
 		# Mostrar productos seleccionados
-		for producto, _ in productos_a_actualizar:
+		for producto in productos_a_actualizar:
 			ctk.CTkLabel(
 				productos_frame, 
 				text=f"{producto['titulo']} - Precio actual: ${producto['precio']}"
@@ -897,11 +2505,12 @@ class VerProductosDialog(ctk.CTkToplevel):
 				
 			try:
 				valor = float(valor)
-				with open('html/JS/productos.json', 'r') as archivo:
-					todos_productos = json.load(archivo)
 				
+				# Calcular todos los precios antes de tocar el catálogo compartido:
+				# si uno falla no queda ningún cambio a medias
 				detalles_cambios = []
-				for producto, _ in productos_a_actualizar:
+				cambios = []
+				for producto in productos_a_actualizar:
 					# Calcular nuevo precio
 					precio_actual = float(producto['precio'])
 					if tipo_actualizacion.get() == "porcentaje":
@@ -911,23 +2520,17 @@ class VerProductosDialog(ctk.CTkToplevel):
 						nuevo_precio = precio_actual + valor
 						tipo_cambio = f"${valor}"
 					
-					# Redondear y actualizar precio
-					producto['precio'] = redondear_precio(str(nuevo_precio))
+					# Redondear el precio nuevo
+					precio_nuevo = redondear_precio(str(nuevo_precio))
+					cambios.append({"id": producto['id'], "precio": precio_nuevo})
 					
 					# Registrar detalle del cambio
 					detalles_cambios.append(
-						f"{producto['titulo']}: ${precio_actual} -> ${producto['precio']} ({tipo_cambio})"
+						f"{producto['titulo']}: ${precio_actual} -> ${precio_nuevo} ({tipo_cambio})"
 					)
-					
-					# Actualizar en la lista completa
-					for i, p in enumerate(todos_productos):
-						if p['id'] == producto['id']:
-							todos_productos[i] = producto
-							break
 				
-				# Guardar cambios
-				with open('html/JS/productos.json', 'w') as archivo:
-					json.dump(todos_productos, archivo, indent=2)
+				# Guardar cambios (actualiza los mismos diccionarios del catálogo)
+				DataManager.instance().actualizar_productos(cambios)
 				
 				# Registrar acción en el historial
 				HistorialDialog.registrar_accion(
@@ -936,7 +2539,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 					detalles="\n".join(detalles_cambios)
 				)
 
-				commit_y_push(repo_dir='.', mensaje_commit="Actualización de precios masiva")
+				PublicadorGit.instance().publicar("Actualización de precios masiva")
 
 				messagebox.showinfo("Éxito", "Precios actualizados correctamente")
 				dialog.destroy()
@@ -947,7 +2550,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 
 	def actualizar_stock_seleccionados(self):
 		# Verificar si hay productos seleccionados
-		productos_a_actualizar = [(p, v) for p, v in self.productos_seleccionados if v.get()]
+		productos_a_actualizar = self.productos_seleccionados()
 		
 		if not productos_a_actualizar:
 			messagebox.showwarning("Advertencia", "No hay productos seleccionados")
@@ -975,7 +2578,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 		productos_frame = ctk.CTkScrollableFrame(frame)
 		productos_frame.pack(fill="both", expand=True, pady=10)
 		
-		for producto, _ in productos_a_actualizar:
+		for producto in productos_a_actualizar:
 			producto_frame = ctk.CTkFrame(productos_frame)
 			producto_frame.pack(fill="x", pady=2)
 			ctk.CTkLabel(producto_frame, 
@@ -993,7 +2596,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 				error_productos = []
 				
 				# Verificar primero si algún producto quedaría con stock negativo
-				for producto, _ in productos_a_actualizar:
+				for producto in productos_a_actualizar:
 					nuevo_stock = producto.get('stock', 0) + cantidad
 					if nuevo_stock < 0:
 						error_productos.append(producto['titulo'])
@@ -1007,23 +2610,12 @@ class VerProductosDialog(ctk.CTkToplevel):
 					return
 				
 				# Si todo está bien, actualizar
-				with open('html/JS/productos.json', 'r') as archivo:
-					todos_productos = json.load(archivo)
-				
-				for producto, _ in productos_a_actualizar:
-					producto['stock'] = producto.get('stock', 0) + cantidad
-					
-					# Actualizar en la lista completa
-					for i, p in enumerate(todos_productos):
-						if p['id'] == producto['id']:
-							todos_productos[i] = producto
-							break
-				
-				# Guardar cambios
-				with open('html/JS/productos.json', 'w') as archivo:
-					json.dump(todos_productos, archivo, indent=2)
+				DataManager.instance().ajustar_stock(
+					[(producto['id'], cantidad) for producto in productos_a_actualizar],
+					motivo="Ajuste masivo"
+				)
 
-				commit_y_push(repo_dir='.', mensaje_commit="Actualización de stock masiva")
+				PublicadorGit.instance().publicar("Actualización de stock masiva")
 				
 				messagebox.showinfo("Éxito", "Stock actualizado correctamente")
 				dialog.destroy()
@@ -1068,16 +2660,8 @@ class VerProductosDialog(ctk.CTkToplevel):
 		
 		def confirmar():
 			try:
-				# Leer productos actuales
-				with open('html/JS/productos.json', 'r') as archivo:
-					productos = json.load(archivo)
-				
-				# Filtrar el producto a eliminar
-				productos = [p for p in productos if p['id'] != producto['id']]
-				
-				# Guardar la lista actualizada
-				with open('html/JS/productos.json', 'w') as archivo:
-					json.dump(productos, archivo, indent=2)
+				# Quitar el producto del catálogo
+				DataManager.instance().eliminar_producto(producto['id'])
 				
 				 # Registrar acción en el historial
 				HistorialDialog.registrar_accion(
@@ -1085,10 +2669,9 @@ class VerProductosDialog(ctk.CTkToplevel):
 					producto=producto['titulo'],
 					detalles=f"Producto eliminado con código: {producto['codigo_barras']}"
 				)
-				commit_y_push(repo_dir='.', mensaje_commit=f"Producto eliminado: {producto['titulo']}")
+				PublicadorGit.instance().publicar(f"Producto eliminado: {producto['titulo']}")
 
 				# Actualizar la vista
-				self.productos = productos
 				self.cargar_productos()
 				
 				# Mostrar mensaje de éxito
@@ -1195,9 +2778,7 @@ class VerProductosDialog(ctk.CTkToplevel):
 		img_label.pack(pady=5)
 		ruta_img = os.path.abspath(os.path.join('html', producto['imagen'].replace('./', ''))) if producto['imagen'] else ""
 		if ruta_img and os.path.exists(ruta_img):
-			pil_image = Image.open(ruta_img)
-			pil_image.thumbnail((150, 150))
-			ctk_image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(150, 150))
+			ctk_image = CacheMiniaturas.instance().obtener(DerivadosImagen.instance().ruta(producto['imagen'], 150), 150)
 			img_label.configure(image=ctk_image)
 			img_label.image = ctk_image
 
@@ -1210,15 +2791,11 @@ class VerProductosDialog(ctk.CTkToplevel):
 				filetypes=[("Archivos de imagen", ".png .jpg .jpeg .gif .bmp")]
 			)
 			if file_path:
-				imagen_nombre = os.path.basename(file_path)
-				destino = os.path.join('html', 'img', imagen_nombre)
 				try:
-					os.makedirs(os.path.join('html', 'img'), exist_ok=True)
-					shutil.copy2(file_path, destino)
-					nueva_imagen_path[0] = f"./img/{imagen_nombre}"
-					pil_image = Image.open(destino)
-					pil_image.thumbnail((150, 150))
-					ctk_image = ctk.CTkImage(light_image=pil_image, dark_image=pil_image, size=(150, 150))
+					# Reducida, recomprimida y nombrada por su contenido
+					nueva_imagen_path[0] = DerivadosImagen.instance().ingresar(file_path)
+					destino = os.path.join('html', nueva_imagen_path[0].replace('./', ''))
+					ctk_image = CacheMiniaturas.instance().obtener(os.path.abspath(destino), 150)
 					img_label.configure(image=ctk_image)
 					img_label.image = ctk_image
 				except Exception as e:
@@ -1232,35 +2809,28 @@ class VerProductosDialog(ctk.CTkToplevel):
 				precio_anterior = producto['precio']
 				titulo_anterior = producto['titulo']
 
-				# Actualizar datos del producto
-				producto['titulo'] = entry_nombre.get()
-				producto['precio'] = redondear_precio(entry_precio.get())
-				producto['categoria'] = {
-					"nombre": variable_categoria.get().upper(),
-					"id": variable_categoria.get().lower()
+				# Armar los datos nuevos aparte: si algo no es válido, el catálogo
+				# compartido queda sin tocar
+				cambios = {
+					"id": producto['id'],
+					"titulo": entry_nombre.get(),
+					"precio": redondear_precio(entry_precio.get()),
+					"categoria": {
+						"nombre": variable_categoria.get().upper(),
+						"id": variable_categoria.get().lower()
+					},
+					"categoria_general": "indumentaria" if variable_categoria.get().lower() in ["remeras", "pantalones", "abrigos"] else "accesorios",
+					"genero": variable_genero.get(),
+					"talles": [talle for talle, var in talle_vars.items() if var.get()],
+					"disciplina": variable_disciplina.get(),
+					"codigo_barras": int(entry_codigo_barras.get()),
+					"imagen": nueva_imagen_path[0]
 				}
-				producto['categoria_general'] = "indumentaria" if variable_categoria.get().lower() in ["remeras", "pantalones", "abrigos"] else "accesorios"
-				producto['genero'] = variable_genero.get()
-				producto['talles'] = [talle for talle, var in talle_vars.items() if var.get()]
-				producto['disciplina'] = variable_disciplina.get()
-				producto['codigo_barras'] = int(entry_codigo_barras.get())
-				producto['imagen'] = nueva_imagen_path[0]
-
-				# Leer todos los productos
-				with open('html/JS/productos.json', 'r') as archivo:
-					productos = json.load(archivo)
-
-				# Encontrar y actualizar el producto
-				for i, p in enumerate(productos):
-					if p['id'] == producto['id']:
-						productos[i] = producto
-						break
 
-				# Guardar cambios
-				with open('html/JS/productos.json', 'w') as archivo:
-					json.dump(productos, archivo, indent=2)
+				# Guardar cambios (actualiza el mismo diccionario del catálogo)
+				DataManager.instance().actualizar_producto(cambios)
 				
-				commit_y_push(repo_dir='.', mensaje_commit=f"Producto modificado: {producto['titulo']}")
+				PublicadorGit.instance().publicar(f"Producto modificado: {producto['titulo']}")
 
 				# Registrar acción en el historial
 				HistorialDialog.registrar_accion(
@@ -1373,16 +2943,8 @@ class ModoVentaDialog(ctk.CTkToplevel):
 		self.entry_codigo_barras.delete(0, 'end')
 
 		try:
-			# Cargar todos los productos
-			with open('html/JS/productos.json', 'r') as archivo:
-				productos = json.load(archivo)
-
 			# Buscar producto con ese código
-			producto = None
-			for p in productos:
-				if str(p.get('codigo_barras')) == codigo:
-					producto = p
-					break
+			producto = DataManager.instance().buscar_por_codigo(codigo)
 
 			if producto:
 				# Crear un frame para mostrar el producto escaneado
@@ -1492,33 +3054,41 @@ class ModoVentaDialog(ctk.CTkToplevel):
 			return
 
 		try:
-			with open('html/JS/productos.json', 'r') as archivo:
-				productos = json.load(archivo)
+			datos = DataManager.instance()
 
+			# Verificar todo el stock antes de descontar nada
 			detalles_venta = []
+			lineas_venta = []
+			cambios = []
+			pendiente = {}
 			for producto_sel, cantidad in seleccionados:
-				for producto in productos:
-					if producto['id'] == producto_sel['id']:
-						if producto['stock'] >= cantidad:
-							producto['stock'] -= cantidad
-							detalles_venta.append(
-								f"{producto['titulo']} (Código: {producto['codigo_barras']}, Cantidad: {cantidad}, Precio: ${producto['precio']})"
-							)
-							self._actualizar_stock_interfaz(producto)
-						else:
-							messagebox.showerror(
-								"Error",
-								f"El producto '{producto['titulo']}' no tiene suficiente stock."
-							)
-							return
-
-			with open('html/JS/productos.json', 'w') as archivo:
-				json.dump(productos, archivo, indent=2)
+				producto = datos.get_producto(producto_sel['id'])
+				if producto is None:
+					continue
+				pendiente[producto['id']] = pendiente.get(producto['id'], 0) + cantidad
+				if producto['stock'] < pendiente[producto['id']]:
+					messagebox.showerror(
+						"Error",
+						f"El producto '{producto['titulo']}' no tiene suficiente stock."
+					)
+					return
+				cambios.append((producto['id'], -cantidad))
+				lineas_venta.append((producto, cantidad))
+				detalles_venta.append(
+					f"{producto['titulo']} (Código: {producto['codigo_barras']}, Cantidad: {cantidad}, Precio: ${producto['precio']})"
+				)
+
+			datos.ajustar_stock(cambios, motivo="Venta")
+			for producto_id in pendiente:
+				self._actualizar_stock_interfaz(datos.get_producto(producto_id))
 
+			# Venta con datos tipados para reportes; el historial guarda el texto y el id
+			venta = VentasManager.instance().registrar_venta(lineas_venta)
 			HistorialDialog.registrar_accion(
 				accion="Venta",
 				producto="Productos vendidos",
-				detalles="\n".join(detalles_venta)
+				detalles="\n".join(detalles_venta),
+				venta_id=venta["id"]
 			)
 
 			messagebox.showinfo("Éxito", "Venta realizada correctamente.")
@@ -1753,13 +3323,9 @@ class ProductoDialog(ctk.CTkToplevel):
 			messagebox.showerror("Error", "El código de barras es obligatorio")
 			return
 			
-		# Cargar productos existentes
-		try:
-			with open('html/JS/productos.json', 'r') as archivo:
-				contenido = archivo.read().strip()
-				productos = json.loads(contenido) if contenido else []
-		except (FileNotFoundError, json.JSONDecodeError):
-			productos = []
+		# Productos existentes
+		datos = DataManager.instance()
+		productos = datos.productos
 
 		# Clasificar categorías
 		categoria_general = "Indumentaria" if categoria_producto.lower() in ["remeras", "pantalones", "abrigos"] else "Accesorios"
@@ -1771,13 +3337,9 @@ class ProductoDialog(ctk.CTkToplevel):
 		# Procesar imagen
 		imagen_ruta = ""
 		if hasattr(self, 'selected_image_path') and self.selected_image_path:
-			imagen_nombre = os.path.basename(self.selected_image_path)
-			destino = os.path.join('html', 'img', imagen_nombre)
-			
 			try:
-				os.makedirs(os.path.join('html', 'img'), exist_ok=True)
-				shutil.copy2(self.selected_image_path, destino)
-				imagen_ruta = f"./img/{imagen_nombre}"
+				# Reducida, recomprimida y nombrada por su contenido
+				imagen_ruta = DerivadosImagen.instance().ingresar(self.selected_image_path)
 			except Exception as e:
 				print(f"Error copiando imagen: {e}")
 				imagen_ruta = ""  # Si falla, deja la ruta vacía
@@ -1804,12 +3366,10 @@ class ProductoDialog(ctk.CTkToplevel):
 
 		# Guardar producto
 		try:
-			productos.append(producto)
-			with open('html/JS/productos.json', 'w') as archivo:
-				json.dump(productos, archivo, indent=2)
+			datos.agregar_producto(producto)
 			
 			# Subir a GitHub
-			commit_y_push(repo_dir='.', mensaje_commit=f"Nuevo producto agregado: {producto['titulo']}")
+			PublicadorGit.instance().publicar(f"Nuevo producto agregado: {producto['titulo']}")
 
 
 			# Registrar acción en el historial
@@ -1839,6 +3399,16 @@ class ProductoDialog(ctk.CTkToplevel):
 			messagebox.showerror("Error", f"No se pudo guardar el producto: {str(e)}")
 
 class ListaPreciosDialog(ctk.CTkToplevel):
+	# Columnas de la tabla
+	HEADERS = {
+		"codigo": "Código",
+		"titulo": "Producto", 
+		"categoria": "Categoría",
+		"talle": "Talle",
+		"color": "Color",
+		"precio": "Precio"
+	}
+
 	def __init__(self, parent):
 		super().__init__(parent)
 		self.title("Lista de Precios")
@@ -1856,6 +3426,7 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 		self.last_category = "Todas"
 		self.seleccion = {}
 		self.productos = []
+		self.filtro = FiltroIncremental(self._es_refinamiento)
 
 		# Frame principal
 		self.main_frame = ctk.CTkFrame(self)
@@ -1869,58 +3440,61 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 		self.tabla_frame.pack(fill="both", expand=True, padx=10, pady=5)
 		self.tabla_frame.grid_columnconfigure((0,1,2,3,4,5), weight=1, uniform="column")
 
+		# Filas ya creadas: se reutilizan entre búsquedas y ordenamientos
+		self.filas = []
+		self.header_labels = {}
+		self._crear_headers()
+		self.vacio_label = ctk.CTkLabel(
+			self.tabla_frame,
+			text="No se encontraron productos con los filtros aplicados.",
+			font=("Helvetica", 16, "bold"),
+			text_color="red"
+		)
+
 		# Cargar productos y mostrar
 		self.cargar_productos()
 
 	def mostrar_productos(self, productos_filtrados):
-		# Limpiar tabla primero
-		for widget in self.tabla_frame.winfo_children():
-			widget.destroy()
+		# Reconciliar la lista nueva con las filas existentes: se actualiza el texto
+		# de las que ya están y solo se crean o destruyen las que sobran o faltan
+		self._actualizar_headers()
 
-		# Crear headers
-		self._crear_headers()
-
-		# Mostrar productos
 		for row, producto in enumerate(productos_filtrados, start=1):
-			self._crear_nueva_fila(producto, row)
+			if row <= len(self.filas):
+				self._actualizar_frame(self.filas[row - 1], producto, row)
+			else:
+				self.filas.append(self._crear_nueva_fila(producto, row))
 
-		# --- Agrega este bloque al final ---
-		if not productos_filtrados:
-			label = ctk.CTkLabel(
-				self.tabla_frame,
-				text="No se encontraron productos con los filtros aplicados.",
-				font=("Helvetica", 16, "bold"),
-				text_color="red"
-			)
-			label.grid(row=1, column=0, padx=10, pady=30, columnspan=6, sticky="nsew")
+		while len(self.filas) > len(productos_filtrados):
+			self.filas.pop().destroy()
+
+		if productos_filtrados:
+			self.vacio_label.grid_remove()
+		else:
+			self.vacio_label.grid(row=1, column=0, padx=10, pady=30, columnspan=6, sticky="nsew")
 
 	def _crear_headers(self):
-		headers = {
-			"codigo": "Código",
-			"titulo": "Producto", 
-			"categoria": "Categoría",
-			"talle": "Talle",
-			"color": "Color",
-			"precio": "Precio"
-				}
-		
-		for i, (key, header) in enumerate(headers.items()):
+		for i, (key, header) in enumerate(self.HEADERS.items()):
 			header_frame = ctk.CTkFrame(self.tabla_frame)
 			header_frame.grid(row=0, column=i, padx=5, pady=5, sticky="ew")
 			
-			# Texto del header con flecha si está ordenado
-			texto = header
-			if self.columna_orden == key:
-				texto = f"{header} {'▼' if self.orden_actual == 'desc' else '▲'}"
-			
 			label = ctk.CTkLabel(
 				header_frame, 
-				text=texto,
+				text=header,
 				font=("Helvetica", 14, "bold"),
 				cursor="hand2"
 			)
 			label.pack(expand=True)
 			label.bind("<Button-1>", lambda e, k=key: self.ordenar_por(k))
+			self.header_labels[key] = label
+
+	def _actualizar_headers(self):
+		# Texto del header con flecha si está ordenado
+		for key, header in self.HEADERS.items():
+			texto = header
+			if self.columna_orden == key:
+				texto = f"{header} {'▼' if self.orden_actual == 'desc' else '▲'}"
+			self.header_labels[key].configure(text=texto)
 
 	def seleccionar_fila(self, row_frame, producto, event=None):
 		# Detener la propagación del evento
@@ -1929,11 +3503,11 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 			event.widget.grab_current()
 		
 		# Deseleccionar fila anterior si existe y es diferente
-		for widget in self.tabla_frame.winfo_children():
-			if isinstance(widget, ctk.CTkFrame) and hasattr(widget, 'producto_id'):
-				if widget != row_frame and widget.producto_id in self.seleccion:
-					widget.configure(fg_color=("gray86", "gray17"))
-					del self.seleccion[widget.producto_id]
+		for widget in self.filas:
+			if widget != row_frame and widget.producto_id in self.seleccion:
+				widget.configure(fg_color=("gray86", "gray17"))
+				widget.seleccionado = False
+				del self.seleccion[widget.producto_id]
 		
 		# Seleccionar o deseleccionar la fila actual
 		if producto['id'] in self.seleccion:
@@ -1942,6 +3516,7 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 		else:
 			row_frame.configure(fg_color=("gray70", "gray30"))
 			self.seleccion[producto['id']] = producto
+		row_frame.seleccionado = producto['id'] in self.seleccion
 
 		# Mostrar el precio del producto seleccionado en el label
 		self.precio_seleccionado_label.configure(
@@ -1949,16 +3524,38 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 		)
 
 	def cargar_productos(self):
-		try:
-			with open('html/JS/productos.json', 'r') as archivo:
-				self.productos = json.load(archivo)
-				self.cached_productos = self.productos
-				self.cached_filtrados = self.productos  # Inicializar cached_filtrados
-				self.mostrar_productos(self.productos)
-		except FileNotFoundError:
-			self.productos = []
-			self.cached_productos = []
-			self.cached_filtrados = []
+		self.productos = DataManager.instance().productos
+		self.version_catalogo = DataManager.instance().version
+		self.cached_productos = self.productos
+		self.cached_filtrados = self.productos  # Inicializar cached_filtrados
+		self.filtro.reiniciar()
+		self.mostrar_productos(self.productos)
+
+	def refrescar_si_cambio(self):
+		"""Al reabrir la ventana: rehacer búsqueda y orden solo si el catálogo cambió"""
+		if self.version_catalogo == DataManager.instance().version:
+			return
+		self.productos = DataManager.instance().productos
+		self.version_catalogo = DataManager.instance().version
+		self.cached_productos = self.productos
+		self.filtro.reiniciar()
+		self.last_search = None  # Forzar la búsqueda aunque el texto no cambió
+		self.filtrar_productos()
+		if self.columna_orden:
+			self._mostrar_ordenados()
+
+	@staticmethod
+	def _es_refinamiento(anterior, nuevo):
+		# Un código con ceros a la izquierda ("07791") coincide con el código 7791 solo por
+		# la comparación numérica, no como texto: ese caso necesita recorrer todo
+		busqueda_a, categoria_a, disciplina_a = anterior
+		busqueda, categoria, disciplina = nuevo
+		return (
+			not (busqueda.isdigit() and busqueda.startswith("0")) and
+			busqueda_a in busqueda and
+			FiltroIncremental.faceta_refinada(categoria_a, categoria) and
+			FiltroIncremental.faceta_refinada(disciplina_a, disciplina)
+		)
 
 	def filtrar_productos(self, *args):
 		busqueda = self.entry_busqueda.get().strip().lower()
@@ -1978,41 +3575,29 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 		self.last_category = categoria
 		self.last_disciplina = disciplina
 
-		productos_filtrados = []
-
-		for p in self.cached_productos:
-			titulo_lower = p['titulo'].lower()
+		def coincide(p):
 			codigo = str(p.get('codigo_barras', ''))
-			disciplina_p = p.get('disciplina', '').lower()
-
-			# Verificar si la búsqueda coincide con el código exacto
-			if busqueda.isdigit() and codigo.isdigit() and int(codigo) == int(busqueda):
-				coincide_categoria = (
-					categoria == "Todas"
-					or categoria.upper() == p['categoria']['nombre'].upper()
-					or categoria.lower() in p['categoria_general'].lower()
-				)
-				coincide_disciplina = (
-					disciplina == "Todas"
-					or disciplina.lower() == disciplina_p
-				)
-				if coincide_categoria and coincide_disciplina:
-					productos_filtrados.append(p)
-				continue
+			# Código exacto, o búsqueda dentro del título y del código
+			if not (
+				(busqueda.isdigit() and codigo.isdigit() and int(codigo) == int(busqueda))
+				or busqueda in p['titulo'].lower() or busqueda in codigo
+			):
+				return False
+			coincide_categoria = (
+				categoria == "Todas"
+				or categoria.upper() == p['categoria']['nombre'].upper()
+				or categoria.lower() in p['categoria_general'].lower()
+			)
+			coincide_disciplina = (
+				disciplina == "Todas"
+				or disciplina.lower() == p.get('disciplina', '').lower()
+			)
+			return coincide_categoria and coincide_disciplina
 
-			# Si no es código exacto, buscar en título y código
-			if busqueda in titulo_lower or busqueda in codigo:
-				coincide_categoria = (
-					categoria == "Todas"
-					or categoria.upper() == p['categoria']['nombre'].upper()
-					or categoria.lower() in p['categoria_general'].lower()
-				)
-				coincide_disciplina = (
-					disciplina == "Todas"
-					or disciplina.lower() == disciplina_p
-				)
-				if coincide_categoria and coincide_disciplina:
-					productos_filtrados.append(p)
+		# Refinar el resultado anterior si la búsqueda se achicó
+		productos_filtrados = self.filtro.filtrar(
+			self.cached_productos, (busqueda, categoria, disciplina), coincide, DataManager.instance().version
+		)
 
 		# Ordenar los resultados numéricamente si es posible
 		def get_sort_key(producto):
@@ -2027,32 +3612,6 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 		self.cached_filtrados = productos_filtrados
 		self.mostrar_productos(productos_filtrados)
 
-	def _crear_headers(self):
-		# Método auxiliar para crear headers con ordenamiento
-		headers = {
-			"codigo": "Código",
-			"titulo": "Producto", 
-			"categoria": "Categoría",
-			"talle": "Talle",
-			"color": "Color",
-			"precio": "Precio"
-		}
-		
-		for i, (key, header) in enumerate(headers.items()):
-			header_frame = ctk.CTkFrame(self.tabla_frame)
-			header_frame.grid(row=0, column=i, padx=5, pady=5, sticky="ew")
-			
-			label = ctk.CTkLabel(
-				header_frame, 
-				text=f"{header} ▼" if self.columna_orden == key and self.orden_actual == "desc"
-				else f"{header} ▲" if self.columna_orden == key and self.orden_actual == "asc"
-				else header,
-				font=("Helvetica", 14, "bold"),
-				cursor="hand2"  # Cambiar cursor a mano
-			)
-			label.pack(expand=True)
-			label.bind("<Button-1>", lambda e, k=key: self.ordenar_por(k))
-
 	def ordenar_por(self, columna):
 		if not self.cached_filtrados:
 			self.cached_filtrados = self.cached_productos.copy()
@@ -2063,6 +3622,10 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 			self.columna_orden = columna
 			self.orden_actual = "asc"
 		
+		self._mostrar_ordenados()
+
+	def _mostrar_ordenados(self):
+		columna = self.columna_orden
 		productos_ordenados = self.cached_filtrados.copy()
 		
 		def get_valor_ordenamiento(producto):
@@ -2099,112 +3662,82 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 		
 		self.mostrar_productos(productos_ordenados)
 
+	@staticmethod
+	def _textos_fila(producto):
+		# Código de barras convertido a string
+		codigo_barras = str(producto.get('codigo_barras', ''))[:8]
+		return (
+			codigo_barras,
+			producto['titulo'],
+			producto['categoria']['nombre'],
+			", ".join(producto.get('talles', [])),
+			producto.get('color', ''),
+			f"${producto['precio']}"
+		)
+
 	def _crear_nueva_fila(self, producto, row):
 		# Crear frame para la fila
 		row_frame = ctk.CTkFrame(self.tabla_frame)
 		row_frame.grid(row=row, column=0, columnspan=6, sticky="ew", padx=2, pady=1)
 		row_frame.grid_columnconfigure((0,1,2,3,4,5), weight=1, uniform="column")
+		row_frame.producto_id = None
+		row_frame.seleccionado = False
+		row_frame.textos = ()
 		
-		# Guardar el ID del producto en el frame para referencia
-		row_frame.producto_id = producto['id']
-		
-		 # Código de barras convertido a string
-		codigo_barras = str(producto.get('codigo_barras', ''))
-		if len(codigo_barras) > 8:
-			codigo_barras = codigo_barras[:8]
-		
-		# Código de barras con nueva fuente
-		ctk.CTkLabel(
-			row_frame, 
-			text=codigo_barras,
-			font=("Helvetica", 12)
-		).grid(row=0, column=0, padx=5, pady=2, sticky="ew")
-		
-		# Nombre del producto
-		ctk.CTkLabel(
-			row_frame, 
-			text=producto['titulo']
-		).grid(row=0, column=1, padx=5, pady=2, sticky="ew")
-		
-		# Categoría
-		ctk.CTkLabel(
-			row_frame, 
-			text=producto['categoria']['nombre']
-		).grid(row=0, column=2, padx=5, pady=2, sticky="ew")
-		
-		# Talles
-		ctk.CTkLabel(
-			row_frame, 
-			text=", ".join(producto.get('talles', []))
-		).grid(row=0, column=3, padx=5, pady=2, sticky="ew")
-		
-		# Color
-		ctk.CTkLabel(
-			row_frame, 
-			text=producto.get('color', '')
-		).grid(row=0, column=4, padx=5, pady=2, sticky="ew")
-		
-		# Precio
-		ctk.CTkLabel(
-			row_frame, 
-			text=f"${producto['precio']}"
-		).grid(row=0, column=5, padx=5, pady=2, sticky="ew")
+		# Código, nombre, categoría, talles, color y precio
+		row_frame.labels = []
+		for col in range(6):
+			label = ctk.CTkLabel(row_frame, text="", font=("Helvetica", 12) if col == 0 else None)
+			label.grid(row=0, column=col, padx=5, pady=2, sticky="ew")
+			row_frame.labels.append(label)
 		
-		# Bind para el clic
-		row_frame.bind("<Button-1>", lambda e, p=producto, rf=row_frame: self.seleccionar_fila(rf, p))
+		# Bind para el clic; el producto se lee del frame porque la fila se reutiliza
+		row_frame.bind("<Button-1>", lambda e, rf=row_frame: self.seleccionar_fila(rf, rf.producto))
+		for child in row_frame.labels:
+			child.bind("<Button-1>", lambda e, rf=row_frame: self.seleccionar_fila(rf, rf.producto, e))
 		
-		# Bind para todos los labels dentro del frame
-		for child in row_frame.winfo_children():
-			child.bind("<Button-1>", lambda e, p=producto, rf=row_frame: self.seleccionar_fila(rf, p, e))
+		self._actualizar_frame(row_frame, producto, row)
+		return row_frame
 
 	def _actualizar_frame(self, row_frame, producto, row):
-		# Actualizar el ID del producto en el frame para referencia
+		# Actualizar el producto en el frame para referencia
+		row_frame.producto = producto
 		row_frame.producto_id = producto['id']
 		
-		# Aplicar color si estaba seleccionado
-		if producto['id'] in self.seleccion:
-			row_frame.configure(fg_color=("gray70", "gray30"))
-		else:
-			row_frame.configure(fg_color=("gray86", "gray17"))
+		# Aplicar color si estaba seleccionado (solo si cambió)
+		seleccionado = producto['id'] in self.seleccion
+		if row_frame.seleccionado != seleccionado:
+			row_frame.configure(fg_color=("gray70", "gray30") if seleccionado else ("gray86", "gray17"))
+			row_frame.seleccionado = seleccionado
 		
-		# Código de barras
-		row_frame.winfo_children()[0].configure(text=producto.get('codigo_barras', '')[:8])
-		
-		# Nombre del producto
-		row_frame.winfo_children()[1].configure(text=producto['titulo'])
-		
-		# Categoría
-		row_frame.winfo_children()[2].configure(text=producto['categoria']['nombre'])
-		
-		# Talles
-		row_frame.winfo_children()[3].configure(text=", ".join(producto.get('talles', [])))
-		
-		# Color
-		row_frame.winfo_children()[4].configure(text=producto.get('color', ''))
-		
-		# Precio
-		row_frame.winfo_children()[5].configure(text=f"${producto['precio']}")
-		
-		# Bind para todos los labels dentro del frame
-		for child in row_frame.winfo_children():
-			child.bind("<Button-1>", lambda e, p=producto, rf=row_frame: self.seleccionar_fila(rf, p, e))
+		# Reconfigurar solo las columnas cuyo texto cambió
+		textos = self._textos_fila(producto)
+		if textos != row_frame.textos:
+			for i, texto in enumerate(textos):
+				if i >= len(row_frame.textos) or row_frame.textos[i] != texto:
+					row_frame.labels[i].configure(text=texto)
+			row_frame.textos = textos
 
 	def crear_barra_busqueda(self):
 		busqueda_frame = ctk.CTkFrame(self.main_frame)
 		busqueda_frame.pack(fill="x", padx=10, pady=5)
 
+		# La búsqueda corre cuando se deja de escribir, no en cada tecla
+		self.filtrar_al_escribir = Debouncer(self, self.filtrar_productos)
+
 		# Nombre
 		ctk.CTkLabel(busqueda_frame, text="Nombre").pack(side="left", padx=5)
 		self.entry_busqueda = ctk.CTkEntry(busqueda_frame, width=200)
 		self.entry_busqueda.pack(side="left", padx=5)
-		self.entry_busqueda.bind('<KeyRelease>', self.filtrar_productos)
+		self.entry_busqueda.bind('<KeyRelease>', self.filtrar_al_escribir)
+		self.entry_busqueda.bind('<Return>', self.filtrar_al_escribir.ejecutar_ya)
 
 		# Filtro por categoría
 		ctk.CTkLabel(busqueda_frame, text="Categoría:").pack(side="left", padx=5)
 		self.combo_categoria = ctk.CTkOptionMenu(
 			busqueda_frame,
 			values=["Todas", "Indumentaria", "Accesorios", "Remeras", "Pantalones", "Abrigos", "Marroquineria", "Bolsos", "Pelotas"],
-			command=self.filtrar_productos
+			command=self.filtrar_al_escribir.ejecutar_ya
 		)
 		self.combo_categoria.pack(side="left", padx=5)
 
@@ -2214,7 +3747,7 @@ class ListaPreciosDialog(ctk.CTkToplevel):
 			busqueda_frame,
 			values=["Todas", "Futbol", "Basquet", "Tenis", "Natacion", "Running", 
 					"Boxeo", "Voley", "Rugby", "Hockey", "Yoga", "Fitness", "Musculacion"],
-			command=self.filtrar_productos
+			command=self.filtrar_al_escribir.ejecutar_ya
 		)
 		self.combo_disciplina.pack(side="left", padx=5)
 
@@ -2247,10 +3780,13 @@ class HistorialDialog(ctk.CTkToplevel):
 		# Crear barra de búsqueda
 		self.crear_barra_busqueda()
 
-		# Frame para la tabla con scroll
-		self.tabla_frame = ctk.CTkScrollableFrame(self.main_frame)
-		self.tabla_frame.pack(fill="both", expand=True, padx=10, pady=5)
-		self.tabla_frame.grid_columnconfigure((0, 1, 2, 3), weight=1, uniform="column")
+		# Tabla virtual: solo crea las filas visibles y las reutiliza al desplazarse
+		self.tabla = TablaVirtual(
+			self.main_frame,
+			columnas=["Fecha", "Acción", "Producto", "Detalles"],
+			formatear_fila=self._formatear_registro
+		)
+		self.tabla.pack(fill="both", expand=True, padx=10, pady=5)
 
 		# Cargar historial
 		self.cargar_historial()
@@ -2260,66 +3796,82 @@ class HistorialDialog(ctk.CTkToplevel):
 		busqueda_frame = ctk.CTkFrame(self.main_frame)
 		busqueda_frame.pack(fill="x", padx=10, pady=5)
 
+		# Los campos de texto filtran cuando se deja de escribir, no en cada tecla
+		self.filtrar_al_escribir = Debouncer(self, self.filtrar_historial)
+
 		# Filtro por tipo de acción
 		ctk.CTkLabel(busqueda_frame, text="Tipo de Acción:").pack(side="left", padx=5)
 		self.combo_tipo_accion = ctk.CTkOptionMenu(
 			busqueda_frame,
 			values=["Todos", "Agregado", "Eliminado", "Modificado", "Precio Actualizado", "Venta"],
-			command=self.filtrar_historial
+			command=self.filtrar_al_escribir.ejecutar_ya
 		)
 		self.combo_tipo_accion.pack(side="left", padx=5)
 
-		# Filtro por fecha
+		# Filtro por fecha (o rango desde/hasta)
 		ctk.CTkLabel(busqueda_frame, text="Fecha:").pack(side="left", padx=5)
 		self.entry_fecha = ctk.CTkEntry(busqueda_frame, width=200)
 		self.entry_fecha.pack(side="left", padx=5)
-		self.entry_fecha.bind('<KeyRelease>', lambda e: self.filtrar_historial())
+		self.entry_fecha.bind('<KeyRelease>', lambda e: self.filtrar_al_escribir())
+
+		ctk.CTkLabel(busqueda_frame, text="Hasta:").pack(side="left", padx=5)
+		self.entry_fecha_hasta = ctk.CTkEntry(busqueda_frame, width=200, placeholder_text="AAAA-MM-DD (opcional)")
+		self.entry_fecha_hasta.pack(side="left", padx=5)
+		self.entry_fecha_hasta.bind('<KeyRelease>', lambda e: self.filtrar_al_escribir())
+
+		# Búsqueda de texto en producto y detalles (nombre, código de barras, etc.)
+		ctk.CTkLabel(busqueda_frame, text="Buscar:").pack(side="left", padx=5)
+		self.entry_texto = ctk.CTkEntry(busqueda_frame, width=200, placeholder_text="Producto o código")
+		self.entry_texto.pack(side="left", padx=5)
+		self.entry_texto.bind('<KeyRelease>', lambda e: self.filtrar_al_escribir())
 
 	def cargar_historial(self):
-		try:
-			# Leer el historial desde un archivo JSON
-			with open('html/JS/historial.json', 'r') as archivo:
-				self.historial = json.load(archivo)
-		except FileNotFoundError:
-			self.historial = []
+		# Por defecto solo el mes actual; el resto se lee al filtrar por otra fecha
+		mes_actual = datetime.now().strftime("%Y-%m")
+		self.entry_fecha.delete(0, 'end')
+		self.entry_fecha.insert(0, mes_actual)
+		self.filtrar_historial()
 
-		# Mostrar el historial completo
-		self.mostrar_historial(self.historial)
+	@staticmethod
+	def _formatear_registro(registro):
+		# Las filas tienen altura fija: los detalles de varias líneas se muestran en una
+		detalles = registro["detalles"].replace("\n", " | ")
+		if len(detalles) > 120:
+			detalles = detalles[:117] + "..."
+		return registro["fecha"], registro["accion"], registro["producto"], detalles
 
 	def mostrar_historial(self, registros):
-		# Limpiar la tabla
-		for widget in self.tabla_frame.winfo_children():
-			widget.destroy()
-
-		# Crear encabezados
-		ctk.CTkLabel(self.tabla_frame, text="Fecha", font=("Helvetica", 14, "bold")).grid(row=0, column=0, padx=5, pady=2, sticky="ew")
-		ctk.CTkLabel(self.tabla_frame, text="Acción", font=("Helvetica", 14, "bold")).grid(row=0, column=1, padx=5, pady=2, sticky="ew")
-		ctk.CTkLabel(self.tabla_frame, text="Producto", font=("Helvetica", 14, "bold")).grid(row=0, column=2, padx=5, pady=2, sticky="ew")
-		ctk.CTkLabel(self.tabla_frame, text="Detalles", font=("Helvetica", 14, "bold")).grid(row=0, column=3, padx=5, pady=2, sticky="ew")
+		self.tabla.set_datos(registros)
 
-		# Mostrar registros
-		for row, registro in enumerate(registros, start=1):
-			ctk.CTkLabel(self.tabla_frame, text=registro["fecha"]).grid(row=row, column=0, padx=5, pady=2, sticky="ew")
-			ctk.CTkLabel(self.tabla_frame, text=registro["accion"]).grid(row=row, column=1, padx=5, pady=2, sticky="ew")
-			ctk.CTkLabel(self.tabla_frame, text=registro["producto"]).grid(row=row, column=2, padx=5, pady=2, sticky="ew")
-			ctk.CTkLabel(self.tabla_frame, text=registro["detalles"]).grid(row=row, column=3, padx=5, pady=2, sticky="ew")
+	def refrescar_si_cambio(self):
+		"""Al reabrir la ventana: volver a filtrar solo si se registraron acciones nuevas"""
+		if self.version_historial != HistorialManager.instance().version:
+			self.filtrar_historial()
 
 	def filtrar_historial(self, *args):
 		tipo_accion = self.combo_tipo_accion.get()
 		fecha = self.entry_fecha.get().strip()
-
-		# Filtrar por tipo de acción y fecha
-		self.filtrado = [
-			registro for registro in self.historial
-			if (tipo_accion == "Todos" or registro["accion"] == tipo_accion) and
-			   (not fecha or fecha in registro["fecha"])
-		]
+		hasta = self.entry_fecha_hasta.get().strip()
+		texto = self.entry_texto.get().strip()
+		accion = None if tipo_accion == "Todos" else tipo_accion
+		historial = HistorialManager.instance()
+		self.version_historial = historial.version
+
+		if (not fecha or historial.es_prefijo_fecha(fecha)) and (not hasta or historial.es_prefijo_fecha(hasta)):
+			# Búsqueda binaria sobre las fechas, posiciones por acción e índice de palabras
+			self.filtrado = historial.filtrar(accion, fecha or None, hasta or fecha or None, texto)
+		else:
+			# Texto que no es un prefijo de fecha (una hora, por ejemplo): buscarlo dentro de la fecha
+			self.filtrado = [
+				registro for registro in historial.filtrar(accion, texto=texto)
+				if fecha in registro["fecha"]
+			]
 
 		# Mostrar los registros filtrados
 		self.mostrar_historial(self.filtrado)
 
 	@staticmethod
-	def registrar_accion(accion, producto, detalles):
+	def registrar_accion(accion, producto, detalles, venta_id=None):
 		# Crear un registro
 		registro = {
 			"fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -2327,20 +3879,175 @@ class HistorialDialog(ctk.CTkToplevel):
 			"producto": producto,
 			"detalles": detalles
 		}
+		if venta_id:
+			registro["venta_id"] = venta_id  # Referencia a la venta en el libro de ventas
+
+		# Agregar el registro al final del historial
+		HistorialManager.instance().registrar(registro)
+
+class EstadisticasDialog(ctk.CTkToplevel):
+	"""Ventas por día y por hora, productos más vendidos y totales por categoría"""
+	def __init__(self, parent):
+		super().__init__(parent)
+		self.title("Estadísticas de Ventas")
+		self.geometry("1024x768")
+		self.lift()  # Mantener ventana al frente
+		self.transient(parent)  # Hacer la ventana dependiente del padre
+		self.focus_force()  # Forzar el foco
+
+		self.analisis = None
+		self.meses_cargados = None  # (meses, versión de las ventas) de las columnas armadas
+
+		# Frame principal
+		self.main_frame = ctk.CTkFrame(self)
+		self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-		# Leer el historial existente
+		# Rango de fechas (por defecto el mes actual)
+		rango_frame = ctk.CTkFrame(self.main_frame)
+		rango_frame.pack(fill="x", padx=10, pady=5)
+		hoy = datetime.now()
+		ctk.CTkLabel(rango_frame, text="Desde (AAAA-MM-DD):").pack(side="left", padx=5)
+		self.entry_desde = ctk.CTkEntry(rango_frame, width=120)
+		self.entry_desde.insert(0, hoy.strftime("%Y-%m-01"))
+		self.entry_desde.pack(side="left", padx=5)
+		ctk.CTkLabel(rango_frame, text="Hasta:").pack(side="left", padx=5)
+		self.entry_hasta = ctk.CTkEntry(rango_frame, width=120)
+		self.entry_hasta.insert(0, hoy.strftime("%Y-%m-%d"))
+		self.entry_hasta.pack(side="left", padx=5)
+		ctk.CTkButton(rango_frame, text="Calcular", command=self.calcular).pack(side="left", padx=5)
+
+		self.resumen_label = ctk.CTkLabel(rango_frame, text="", font=("Helvetica", 14, "bold"), text_color="green")
+		self.resumen_label.pack(side="right", padx=10)
+
+		# Resultados
+		self.resultados_frame = ctk.CTkScrollableFrame(self.main_frame)
+		self.resultados_frame.pack(fill="both", expand=True, padx=10, pady=5)
+		self.resultados_frame.grid_columnconfigure((0, 1), weight=1, uniform="column")
+
+		self.calcular()
+
+	def _cargar_analisis(self, desde, hasta):
+		# Leer solo los meses del rango; si no cambiaron ni hubo ventas nuevas
+		# se reutilizan las columnas ya armadas
+		ventas = VentasManager.instance()
+		clave = (ventas.meses_entre(desde, hasta), ventas.version)
+		if clave != self.meses_cargados or self.analisis is None:
+			self.analisis = AnalisisVentas(ventas.cargar(clave[0]))
+			self.meses_cargados = clave
+
+	def calcular(self):
+		desde = self.entry_desde.get().strip()
+		hasta = self.entry_hasta.get().strip()
 		try:
-			with open('html/JS/historial.json', 'r') as archivo:
-				historial = json.load(archivo)
-		except FileNotFoundError:
-			historial = []
+			self._cargar_analisis(desde, hasta)
+			por_dia = self.analisis.ingresos_por_dia(desde, hasta)
+			por_hora = self.analisis.ingresos_por_hora(desde, hasta)
+			top = self.analisis.mas_vendidos(10, desde, hasta)
+			por_categoria = self.analisis.totales_por_categoria(desde, hasta)
+		except ValueError:
+			messagebox.showerror("Error", "Ingrese fechas válidas con el formato AAAA-MM-DD")
+			return
 
-		# Agregar el nuevo registro
-		historial.append(registro)
+		total = sum(ingreso for _, ingreso in por_dia)
+		unidades = sum(u for _, u, _ in por_categoria)
+		self.resumen_label.configure(text=f"Total: ${total:.2f} - Unidades: {unidades}")
 
-		# Guardar el historial actualizado
-		with open('html/JS/historial.json', 'w') as archivo:
-			json.dump(historial, archivo, indent=2)
+		# Limpiar resultados anteriores
+		for widget in self.resultados_frame.winfo_children():
+			widget.destroy()
+
+		self._crear_tabla(0, 0, "Ingresos por día", ["Día", "Ingresos"],
+			[(dia, f"${ingreso:.2f}") for dia, ingreso in por_dia])
+		self._crear_tabla(0, 1, "Ingresos por hora", ["Hora", "Ingresos"],
+			[(f"{hora:02d}:00", f"${ingreso:.2f}") for hora, ingreso in por_hora if ingreso])
+		self._crear_tabla(1, 0, "Más vendidos", ["Producto", "Unidades", "Ingresos"],
+			[(titulo, str(u), f"${ingreso:.2f}") for titulo, u, ingreso in top])
+		self._crear_tabla(1, 1, "Por categoría", ["Categoría", "Unidades", "Ingresos"],
+			[(categoria, str(u), f"${ingreso:.2f}") for categoria, u, ingreso in por_categoria])
+
+	def _crear_tabla(self, fila, columna, titulo, headers, filas):
+		frame = ctk.CTkFrame(self.resultados_frame)
+		frame.grid(row=fila, column=columna, padx=10, pady=10, sticky="nsew")
+		frame.grid_columnconfigure(tuple(range(len(headers))), weight=1)
+
+		ctk.CTkLabel(frame, text=titulo, font=("Helvetica", 16, "bold")).grid(row=0, column=0, columnspan=len(headers), pady=5)
+		for i, header in enumerate(headers):
+			ctk.CTkLabel(frame, text=header, font=("Helvetica", 14, "bold")).grid(row=1, column=i, padx=5, pady=2, sticky="ew")
+		for row, valores in enumerate(filas, start=2):
+			for col, valor in enumerate(valores):
+				ctk.CTkLabel(frame, text=valor).grid(row=row, column=col, padx=5, pady=2, sticky="ew")
+		if not filas:
+			ctk.CTkLabel(frame, text="Sin ventas en el período", text_color="red").grid(row=2, column=0, columnspan=len(headers), pady=5)
+
+class MetricasGitDialog(ctk.CTkToplevel):
+	"""Tiempos de cada publicación en GitHub (stage, commit y push) para ver dónde se va el tiempo"""
+	def __init__(self, parent):
+		super().__init__(parent)
+		self.title("Métricas de Publicación")
+		self.geometry("900x600")
+		self.lift()  # Mantener ventana al frente
+		self.transient(parent)  # Hacer la ventana dependiente del padre
+		self.focus_force()  # Forzar el foco
+
+		# Frame principal
+		self.main_frame = ctk.CTkFrame(self)
+		self.main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+		# Resumen y botón para actualizar
+		resumen_frame = ctk.CTkFrame(self.main_frame)
+		resumen_frame.pack(fill="x", padx=10, pady=5)
+		self.resumen_label = ctk.CTkLabel(resumen_frame, text="", font=("Helvetica", 14, "bold"), justify="left")
+		self.resumen_label.pack(side="left", padx=5)
+		ctk.CTkButton(resumen_frame, text="Actualizar", command=self.cargar_metricas).pack(side="right", padx=5)
+
+		# Tabla
+		self.tabla_frame = ctk.CTkScrollableFrame(self.main_frame)
+		self.tabla_frame.pack(fill="both", expand=True, padx=10, pady=5)
+		self.tabla_frame.grid_columnconfigure((0, 1, 2, 3, 4, 5, 6), weight=1, uniform="column")
+
+		self.cargar_metricas()
+
+	@staticmethod
+	def _formatear(segundos):
+		return "-" if segundos is None else f"{segundos:.2f} s"
+
+	def cargar_metricas(self):
+		metricas = PublicadorGit.instance().leer_metricas()
+
+		# Promedio y máximo por etapa
+		lineas = [f"Publicaciones: {len(metricas)}"]
+		for etapa in ("stage", "commit", "push", "total"):
+			valores = [m[etapa] for m in metricas if m.get(etapa) is not None]
+			if valores:
+				lineas.append(
+					f"{etapa}: promedio {self._formatear(sum(valores) / len(valores))}, "
+					f"máximo {self._formatear(max(valores))}"
+				)
+		self.resumen_label.configure(text="   ".join(lineas))
+
+		# Limpiar la tabla
+		for widget in self.tabla_frame.winfo_children():
+			widget.destroy()
+
+		for i, header in enumerate(["Fecha", "Cambios", "Stage", "Commit", "Push", "Total", "Resultado"]):
+			ctk.CTkLabel(self.tabla_frame, text=header, font=("Helvetica", 14, "bold")).grid(row=0, column=i, padx=5, pady=2, sticky="ew")
+
+		for row, m in enumerate(metricas, start=1):
+			valores = [
+				m.get("fecha", ""),
+				str(m.get("cambios", "")),
+				self._formatear(m.get("stage")),
+				self._formatear(m.get("commit")),
+				self._formatear(m.get("push")),
+				self._formatear(m.get("total"))
+			]
+			for col, valor in enumerate(valores):
+				ctk.CTkLabel(self.tabla_frame, text=valor).grid(row=row, column=col, padx=5, pady=2, sticky="ew")
+			ctk.CTkLabel(
+				self.tabla_frame,
+				text="OK" if not m.get("error") else "Error",
+				text_color="green" if not m.get("error") else "red"
+			).grid(row=row, column=6, padx=5, pady=2, sticky="ew")
 
 class LoginDialog(ctk.CTkToplevel):
 	def __init__(self, parent):
@@ -2393,8 +4100,18 @@ class LoginDialog(ctk.CTkToplevel):
 			messagebox.showerror("Error", "Usuario o contraseña incorrectos")
 
 if __name__ == "__main__":
+	if "--miniaturas" in sys.argv:
+		# python customtk.py --miniaturas: generar las miniaturas de todo html/img
+		print(f"Miniaturas generadas para {DerivadosImagen.instance().generar_faltantes()} imágenes")
+		sys.exit()
 	try:
 		app = App()
 		app.mainloop()
 	except TclError:
-		pass  # Ignora el error al cerrar la app
\ No newline at end of file
+		pass  # Ignora el error al cerrar la app
+	finally:
+		DataManager.instance().compactar()
+		# Los manifiestos del historial y de las ventas se escriben con demora
+		for manager in (HistorialManager, VentasManager):
+			if manager._instance is not None:
+				manager._instance.guardar_manifiesto()
\ No newline at end of file
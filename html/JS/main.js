@@ -21,9 +21,27 @@ const color_hex_map = {
 // Modificar la carga inicial de productos
 let productos = [];
 
-fetch('JS/productos.json')
-    .then(response => response.json())
-    .then(data => {
+// Miniaturas generadas por la app (img/miniaturas/indice.json): ruta de la imagen -> hash
+let miniaturas = {};
+const soportaWebp = document.createElement('canvas').toDataURL('image/webp').startsWith('data:image/webp');
+
+// Devuelve la miniatura del tamaño pedido si existe, o la imagen original
+function srcImagen(imagen, tamano = 400) {
+    if (!imagen || imagen.trim() === "") {
+        return "img/placeholder.png";
+    }
+    const hash = miniaturas[imagen.replace(/^\.\//, '')];
+    return hash ? `img/miniaturas/${hash}_${tamano}.${soportaWebp ? 'webp' : 'jpg'}` : imagen;
+}
+
+Promise.all([
+    fetch('JS/productos.json').then(response => response.json()),
+    fetch('img/miniaturas/indice.json')
+        .then(response => response.ok ? response.json() : {})
+        .catch(() => ({}))
+])
+    .then(([data, indice]) => {
+        miniaturas = indice;
         productos = data;
         cargarProductos(productos); // Cargar productos inmediatamente después de obtenerlos
     })
@@ -60,9 +78,7 @@ function mostrarProductos(productos) {
                 }
             }
 
-            const imagenSrc = productoAMostrar.imagen && productoAMostrar.imagen.trim() !== ""
-                ? productoAMostrar.imagen
-                : "img/placeholder.png";
+            const imagenSrc = srcImagen(productoAMostrar.imagen);
 
             div.innerHTML = `
             <img class="producto-img" src="${imagenSrc}" alt="${productoAMostrar.titulo}">
@@ -97,9 +113,7 @@ function mostrarProductos(productos) {
                 select.addEventListener('change', (e) => {
                     const varianteSeleccionada = productos.find(p => p.id === e.target.value);
                     if (varianteSeleccionada) {
-                        div.querySelector('.producto-img').src = varianteSeleccionada.imagen && varianteSeleccionada.imagen.trim() !== ""
-                            ? varianteSeleccionada.imagen
-                            : "img/placeholder.png";
+                        div.querySelector('.producto-img').src = srcImagen(varianteSeleccionada.imagen);
                         div.querySelector('.producto-precio').innerText = `$${varianteSeleccionada.precio}`;
                         div.querySelector('.producto-talles').innerText = `Talles: ${varianteSeleccionada.talles ? varianteSeleccionada.talles.join(', ') : 'No disponible'}`;
                         div.querySelector('.producto-consultar').id = varianteSeleccionada.id;
@@ -431,9 +445,7 @@ function cargarProductos(productos) {
             }
 
             // Usar placeholder si no hay imagen
-            const imagenSrc = productoAMostrar.imagen && productoAMostrar.imagen.trim() !== ""
-                ? productoAMostrar.imagen
-                : "img/placeholder.png";
+            const imagenSrc = srcImagen(productoAMostrar.imagen);
 
             div.innerHTML = `
             <img class="producto-img" src="${imagenSrc}" alt="${productoAMostrar.titulo}">
@@ -472,9 +484,7 @@ function cargarProductos(productos) {
                 select.addEventListener('change', (e) => {
                     const varianteSeleccionada = productos.find(p => p.id === e.target.value);
                     if (varianteSeleccionada) {
-                        div.querySelector('.producto-img').src = varianteSeleccionada.imagen && varianteSeleccionada.imagen.trim() !== ""
-                            ? varianteSeleccionada.imagen
-                            : "img/placeholder.png";
+                        div.querySelector('.producto-img').src = srcImagen(varianteSeleccionada.imagen);
                         div.querySelector('.producto-precio').innerText = `$${varianteSeleccionada.precio}`;
                         div.querySelector('.producto-talles').innerText = `Talles: ${varianteSeleccionada.talles ? varianteSeleccionada.talles.join(', ') : 'No disponible'}`;
                         div.querySelector('.producto-consultar').id = varianteSeleccionada.id;